@@ -1,17 +1,27 @@
 import streamlit as st
-import pandas as pd
-import requests
 import os
 from dotenv import load_dotenv
 from datetime import datetime
-import time # for rate limiting example
-import csv
-from io import StringIO
-import math
-import altair as alt
+import asyncio
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# Only light modules are imported up front, so the page shell renders before anything heavy
+# loads. pandas/requests (scanner.engine), altair (scanner.charts), the Brave client and the
+# Binance stream are imported where they are first needed; `python -m scanner startup` tracks this.
+from scanner.cache import get_snapshot_cache, snapshot_cache_key, snapshot_path
+from scanner.config import (
+    BRAVE_RATE_LIMIT_RPS, COINGECKO_MAX_PAGES, DEFAULT_SCAN_PAGES, DEFAULT_WINDOW, LIVE_REFRESH_SECONDS,
+    RANKING_WINDOWS, SNAPSHOT_REVALIDATE_WAIT_SECONDS, SNAPSHOT_TTL_SECONDS,
+)
+from scanner.metrics import get_metrics_server
+from scanner.models import ScanError, ScanResult
+from scanner.refresher import get_snapshot_refresher
+from scanner.timing import stage
 
 load_dotenv() # Carrega variáveis do arquivo .env
 
+COMBINED_WINDOW = "Combinado"
+
 # --- Page Configuration ---
 st.set_page_config(page_title="Crypto Coin Scanner", page_icon="💰", layout="wide")
 
@@ -82,385 +92,276 @@ with st.sidebar.expander("🔑 Configurar Brave Search API Key (Opcional)"):
         st.caption(f"Chave Brave do .env: ...{brave_api_key_env[-4:] if len(brave_api_key_env) > 4 else '****'}")
     else:
         st.caption("Nenhuma Brave API Key configurada no .env")
+    brave_rate_limit_rps = st.number_input(
+        "Limite de requisições Brave (req/s)",
+        min_value=0.1,
+        max_value=100.0,
+        value=max(0.1, BRAVE_RATE_LIMIT_RPS),
+        step=0.5,
+        disabled=not brave_api_key_input_value,
+        help="Taxa permitida pelo plano da sua própria Brave API Key (plano gratuito: 1 req/s). "
+             "A chave do .env usa sempre BRAVE_RATE_LIMIT_RPS."
+    )
 
-# Determine Brave API key to use
+# Determine Brave API key to use; only a session's own key may be paced faster than the server setting
+brave_rate_limit_rps_in_use = BRAVE_RATE_LIMIT_RPS
 if brave_api_key_input_value:
     brave_api_key = brave_api_key_input_value
+    brave_rate_limit_rps_in_use = brave_rate_limit_rps
 elif brave_api_key_env:
     brave_api_key = brave_api_key_env
 else:
     brave_api_key = ""
 
-# --- Helper Functions ---
-def get_top_gainers(key):
-    """Fetches the top gaining coins from CoinGecko API."""
-    if not key:
-        st.warning("Por favor, insira a API Key para buscar os dados.")
-        return None
-
-    all_coins_data = []
-    base_url = "https://api.coingecko.com/api/v3/coins/markets"
-    headers = {"x-cg-demo-api-key": key}
-    
-    for page_num in [1, 2]:
-        params = {
-            "vs_currency": "usd",
-            "order": "market_cap_desc",
-            "per_page": 100,
-            "page": page_num,
-            "sparkline": "false",
-            "price_change_percentage": "24h"
-        }
-        try:
-            response = requests.get(base_url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()  # Raises an exception for 4XX/5XX errors
-            page_data = response.json()
-            if page_data:
-                all_coins_data.extend(page_data)
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
-                st.error("API Key inválida ou não autorizada. Verifique sua chave e tente novamente.")
-                return None # Critical error, stop
-            elif e.response.status_code == 429:
-                st.error(f"Limite de requisições da API atingido (tentativa na página {page_num}).")
-                if not all_coins_data: # If rate limited and no data yet from previous pages
-                    return None
-                break # Stop trying further pages, proceed with data collected so far
-            else: # Other HTTP errors
-                st.error(f"Erro HTTP {e.response.status_code} ao buscar dados da página {page_num}.")
-                if not all_coins_data: return None
-                break
-        except requests.exceptions.RequestException as e: # Covers connection errors, timeouts, etc.
-            st.error(f"Erro de conexão ao buscar dados da página {page_num}: {e}")
-            if not all_coins_data:
-                return None
-            break # Stop trying further pages
-        except Exception as e: # Catch other potential errors like JSONDecodeError
-            st.error(f"Ocorreu um erro inesperado ao processar dados da página {page_num}: {e}")
-            if not all_coins_data:
-                return None
-            break
-
-    if not all_coins_data:
-        st.warning("Nenhuma moeda foi encontrada após as tentativas de busca. Verifique a API Key e a conexão.")
-        return None
-
-    # Deduplicate coins using 'id' as a unique identifier, last seen instance prevails
-    unique_coins_map = {coin['id']: coin for coin in all_coins_data}
-    unique_coins_data = list(unique_coins_map.values())
-    
-    # Filter out coins with None for 'price_change_percentage_24h_in_currency'
-    valid_coins = [
-        coin for coin in unique_coins_data 
-        if coin.get('price_change_percentage_24h_in_currency') is not None
-    ]
-    
-    # Filter by minimum total volume
-    filtered_by_volume = [
-        coin for coin in valid_coins 
-        if coin.get('total_volume') is not None and coin['total_volume'] > 1000000
-    ]
-
-    # Sort by 'price_change_percentage_24h_in_currency' in descending order
-    sorted_coins = sorted(
-        filtered_by_volume, 
-        key=lambda x: x['price_change_percentage_24h_in_currency'], 
-        reverse=True
-    )
-    
-    if not sorted_coins:
-        st.info("Nenhuma moeda atendeu aos critérios de volume e variação de preço após o processamento dos dados coletados.")
-        return None
-        
-    return sorted_coins[:10]
-
-# --- Helper Functions (Binance) ---
-def get_binance_tradable_usdt_pairs():
-    """Fetches all USDT trading pairs from Binance and caches them in session state."""
-    if 'binance_usdt_pairs' not in st.session_state or st.session_state.binance_usdt_pairs is None:
-        st.session_state.binance_usdt_pairs = set() # Default to empty set on error or if not fetched
-        try:
-            response = requests.get("https://api.binance.com/api/v3/exchangeInfo", timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            st.session_state.binance_usdt_pairs = {
-                s['symbol'] for s in data['symbols'] 
-                if s['quoteAsset'] == 'USDT' and s['status'] == 'TRADING'
-            }
-        except requests.exceptions.RequestException as e:
-            st.sidebar.warning(f"⚠️ Erro ao buscar pares da Binance: {e}. Verificação da Binance pode falhar.")
-        except Exception as e:
-            st.sidebar.warning(f"⚠️ Erro inesperado ao processar pares da Binance: {e}.")
-    return st.session_state.binance_usdt_pairs
-
-def check_binance_data(coin_symbol, tradable_usdt_pairs):
-    """
-    Checks coin availability on Binance and fetches price and 24h volume.
-    Uses a pre-fetched set of tradable USDT pairs.
-    """
-    binance_symbol_usdt = f"{coin_symbol.upper()}USDT"
-    
-    default_error_result = {
-        "status_binance": "⚠️ Erro Verificação",
-        "price_binance": "N/A",
-        "volume_binance": "N/A"
+# --- Display Helpers ---
+def show_scan_errors(errors):
+    """Shows the ScanErrors of a scan: Binance problems in the sidebar, the rest in the main area."""
+    for error in errors:
+        if error.source == "binance":
+            st.sidebar.warning(error.message)
+        elif error.level == "error":
+            st.error(error.message)
+        elif error.level == "warning":
+            st.warning(error.message)
+        else:
+            st.info(error.message)
+
+def format_age(age_s):
+    """Human-readable age: seconds, minutes, hours or days."""
+    if age_s < 120:
+        return f"{age_s:.0f}s"
+    if age_s < 2 * 3600:
+        return f"{age_s / 60:.0f} min"
+    if age_s < 2 * 86400:
+        return f"{age_s / 3600:.0f} h"
+    return f"{age_s / 86400:.0f} dias"
+
+def show_snapshot_status(fetched_at_utc, key):
+    """Staleness badge for the snapshot on screen: fresh, stale, refreshing or last refresh failed."""
+    age_s = (datetime.utcnow() - fetched_at_utc).total_seconds()
+    age_text = format_age(age_s)
+    failure = get_snapshot_cache().last_failure(key)
+    revalidating = get_snapshot_cache().is_revalidating(key)
+    if failure:
+        reason = next((error.message for error in failure if error.level == "error"), failure[0].message)
+        retrying = " Nova tentativa em andamento." if revalidating else ""
+        st.caption(f":red[⚠️ Última atualização falhou, exibindo os últimos dados válidos ({age_text} atrás): {reason}{retrying}]")
+    elif revalidating:
+        st.caption(f":blue[🔄 Atualizando em segundo plano · dados de {age_text} atrás]")
+    elif age_s > SNAPSHOT_TTL_SECONDS:
+        st.caption(f":orange[🕒 Dados desatualizados ({age_text} atrás)]")
+    else:
+        st.caption(f":green[🟢 Dados atualizados ({age_text} atrás)]")
+
+def price_column_format(prices):
+    """Sub-cent prices need 8 decimals to be readable; everything else uses 4."""
+    return "$%.8f" if (prices < 0.01).any() else "$%.4f"
+
+def coins_column_config(coins_df):
+    """Display-time formatting for the numeric columns of coins_df; the underlying data stays numeric."""
+    return {
+        "Preço CoinGecko (USD)": st.column_config.NumberColumn(format=price_column_format(coins_df["Preço CoinGecko (USD)"])),
+        **{column: st.column_config.NumberColumn(format="%.2f%%") for column in coins_df.columns if column.startswith("% Subida")},
+        "Posição média (%)": st.column_config.NumberColumn(format="%.1f%%"),
+        "Preço Binance (USD)": st.column_config.NumberColumn(format=price_column_format(coins_df["Preço Binance (USD)"])),
+        "Volume Binance (24h)": st.column_config.NumberColumn(format="dollar"),
     }
 
-    if tradable_usdt_pairs is None or not isinstance(tradable_usdt_pairs, set):
-        return {
-            "status_binance": "❌ Verif. Indisponível",
-            "price_binance": "N/A",
-            "volume_binance": "N/A"
-        }
-
-    if not tradable_usdt_pairs: # If the set is empty due to a fetch error
-        return {
-            "status_binance": "⚠️ Binance Indisponível", # Cannot check due to earlier error
-            "price_binance": "N/A",
-            "volume_binance": "N/A"
-        }
-
-    if binance_symbol_usdt not in tradable_usdt_pairs:
-        return {
-            "status_binance": "❌ Não na Binance (USDT)",
-            "price_binance": "N/A",
-            "volume_binance": "N/A"
-        }
-
-    try:
-        ticker_url = f"https://api.binance.com/api/v3/ticker/24hr?symbol={binance_symbol_usdt}"
-        response = requests.get(ticker_url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        
-        price = float(data.get('lastPrice', 0))
-        volume_usdt = float(data.get('quoteVolume', 0)) # Volume in USDT
-
-        return {
-            "status_binance": "✅ Na Binance",
-            "price_binance": f"${price:,.8f}" if price < 0.01 else f"${price:,.2f}",
-            "volume_binance": f"${volume_usdt:,.2f}"
-        }
-    except requests.exceptions.HTTPError as e:
-        status_message = f"⚠️ Erro {e.response.status_code} Binance"
-        if e.response.status_code == 400 and e.response.text and "Invalid symbol" in e.response.text:
-             status_message = f"❌ {coin_symbol.upper()} Inválido (Ticker)"
-        elif e.response.status_code == 404:
-             status_message = f"❌ {coin_symbol.upper()} Não Listado (Ticker)"
-        st.sidebar.warning(f"Erro HTTP {e.response.status_code} para {binance_symbol_usdt} na Binance.")
-        return {**default_error_result, "status_binance": status_message}
-    except requests.exceptions.RequestException:
-        st.sidebar.warning(f"Erro de conexão para {binance_symbol_usdt} na Binance.")
-        return {**default_error_result, "status_binance": "⚠️ Erro Conexão Binance"}
-    except Exception as e:
-        st.sidebar.warning(f"Erro ao processar dados de {binance_symbol_usdt} da Binance: {str(e)[:100]}")
-        return {**default_error_result, "status_binance": f"⚠️ Erro Dados Binance"}
-
-# --- Helper Function (Brave Search) ---
-def get_brave_search_news(coin_name, b_api_key, count=3):
-    """Fetches news for a coin using Brave Web Search API."""
-    if not b_api_key:
-        return {"error": "Brave Search API Key não fornecida."}
-    if not coin_name:
-        return {"error": "Nome da moeda não fornecido."}
-
-    headers = {
-        "Accept": "application/json",
-        "X-Subscription-Token": b_api_key
-    }
-    # Updated parameters for Web Search API
-    params = {
-        "q": f'{coin_name} coin news', # More specific query including 'coin'
-        "count": count,
-        "safesearch": "moderate",
-        "freshness": "pd" # Past day results
-        # No 'result_filter' means API returns all types (news, web, etc.)
-        # "country": "us", # Optional: specify country
-        # "search_lang": "en", # Optional: specify search language
-    }
-    try:
-        # Updated endpoint for Web Search API
-        response = requests.get("https://api.search.brave.com/res/v1/web/search", headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        # Attempt to parse 'news' results first, then 'web' results as a fallback
-        processed_items = []
-        
-        # 1. Try 'news' results from the 'news' field
-        news_specific_data = data.get('news', {}) 
-        news_specific_results = news_specific_data.get('results', [])
-
-        if news_specific_results:
-            for item in news_specific_results:
-                title = item.get('title', 'N/A')
-                url = item.get('url', '#')
-                snippet = item.get('description', item.get('snippet', 'N/A')) 
-                source = item.get('source', item.get('meta_url', {}).get('hostname', 'N/A')) 
-                processed_items.append({
-                    "title": title,
-                    "url": url,
-                    "snippet": snippet,
-                    "source": source
-                })
-        
-        # 2. If no 'news' specific results were found, try 'web' results from the 'web' field
-        if not processed_items:
-            general_web_data = data.get('web', {})
-            general_web_results = general_web_data.get('results', [])
-            if general_web_results:
-                # Optional: st.sidebar.info(f"Mostrando resultados web gerais para {coin_name}...")
-                for item in general_web_results:
-                    title = item.get('title', 'N/A')
-                    url = item.get('url', '#')
-                    snippet = item.get('description', item.get('snippet', 'N/A')) 
-                    source = item.get('source', item.get('meta_url', {}).get('hostname', 'N/A'))
-                    processed_items.append({
-                        "title": title,
-                        "url": url,
-                        "snippet": snippet,
-                        "source": source
-                    })
-
-        # 3. Return collected items if any, otherwise a 'not found' message
-        if processed_items:
-            return {"news": processed_items} # Keep the key "news" for consistency in display logic
+def render_news_result(coin_symbol, coin_name, news_result):
+    """Renders one coin's Brave results inside its expander."""
+    with st.expander(f"Notícias para {coin_symbol} ({coin_name})"):
+        if "news" in news_result and news_result["news"]:
+            for item in news_result["news"]:
+                st.markdown(f"**[{item['title']}]({item['url']})** - *{item['source']}*", unsafe_allow_html=True)
+                st.caption(item['snippet'])
+                st.markdown("---")
+        elif "message" in news_result:
+            st.info(news_result["message"])
+        elif "error" in news_result:
+            st.error(news_result["error"])
         else:
-            return {"message": f"Nenhuma notícia ou resultado web relevante encontrado para {coin_name} com os filtros atuais."}
-    except requests.exceptions.HTTPError as e:
-        error_message = f"Erro HTTP {e.response.status_code} com Brave Web Search API para {coin_name}."
-        if e.response.status_code == 401:
-            error_message += " Verifique sua Brave API Key."
-        elif e.response.status_code == 429:
-            error_message += " Limite de requisições da Brave API atingido."
-        elif e.response.status_code == 403:
-             error_message += " Acesso não autorizado à Brave API. Verifique sua subscrição ou endpoint."
-        st.sidebar.warning(error_message)
-        return {"error": error_message}
-    except requests.exceptions.RequestException as e:
-        st.sidebar.warning(f"Erro de conexão com Brave Web Search API para {coin_name}: {e}")
-        return {"error": f"Erro de conexão com Brave Web Search API para {coin_name}."}
-    except Exception as e: # Catch other potential errors like JSONDecodeError
-        st.sidebar.warning(f"Erro inesperado ao buscar notícias para {coin_name} no Brave Web Search: {e}")
-        return {"error": f"Erro inesperado ao buscar notícias para {coin_name}."}
-
+            st.info(f"Nenhuma informação de notícias para {coin_name}.")
+
+# --- Scan Depth ---
+scan_pages = st.sidebar.slider(
+    "Profundidade da busca (páginas de 250 moedas)",
+    min_value=1,
+    max_value=COINGECKO_MAX_PAGES,
+    value=DEFAULT_SCAN_PAGES,
+    help="Quantas páginas do ranking por capitalização de mercado serão analisadas. As páginas são buscadas em paralelo."
+)
+
+# --- Background Snapshot Refresher ---
+snapshot_refresher = get_snapshot_refresher()
+with st.sidebar.expander("🔄 Atualização Automática"):
+    if snapshot_refresher is None:
+        st.caption("Desativada. Defina BACKGROUND_REFRESH_SECONDS e COINGECKO_API_KEY no .env para ativar.")
+    else:
+        st.caption(f"Intervalo: a cada {snapshot_refresher.interval:g}s ({snapshot_refresher.pages} página(s))")
+        if snapshot_refresher.last_refresh_utc is not None:
+            st.caption(f"Última atualização: {snapshot_refresher.last_refresh_utc.strftime('%H:%M:%S')} UTC")
+            st.caption(f"Duração: {snapshot_refresher.last_duration_s:.2f}s")
+        else:
+            st.caption("Primeira atualização em andamento...")
+        if snapshot_refresher.last_error:
+            st.warning(f"Última atualização falhou: {snapshot_refresher.last_error}")
+
+# --- Metrics Endpoint ---
+get_metrics_server() # Serves Prometheus metrics on METRICS_PORT (no-op when unset); started once per process
+
+# --- Binance Streaming Mode ---
+binance_streaming = st.sidebar.toggle(
+    "⚡ Preços Binance em tempo real (WebSocket)",
+    value=os.getenv("BINANCE_STREAM", "0") == "1",
+    help="Mantém preço e volume da Binance atualizados via stream, sem chamadas REST por busca."
+)
+binance_stream = None
+if binance_streaming:
+    try:
+        import websockets # noqa: F401 - only checks that the optional dependency is installed
+        from scanner.stream import get_binance_ticker_stream
+        binance_stream = get_binance_ticker_stream().start()
+    except ImportError:
+        st.sidebar.warning("Instale o pacote `websockets` para usar o modo em tempo real.")
+if binance_stream is not None:
+    if binance_stream.is_fresh():
+        st.sidebar.caption(f"🟢 Stream conectado · {len(binance_stream.table)} pares · {binance_stream.reconnects} reconexões · {binance_stream.gaps} lacunas")
+    else:
+        st.sidebar.caption(f"🟡 Stream sincronizando... ({binance_stream.last_error or 'conectando'})")
 
 # --- Data Fetching and State Update ---
+# Stale-while-revalidate: the last good snapshot stays on screen (with a staleness badge)
+# while refreshes run in a background thread, so outages and slow upstreams never blank the table.
+# The engine (pandas, requests) is imported only once there is a saved snapshot to show or a key to scan with.
+snapshot_key = snapshot_cache_key(scan_pages)
+snapshot_cache = get_snapshot_cache()
+saved_snapshot_path = snapshot_path(scan_pages)
+if saved_snapshot_path and os.path.exists(saved_snapshot_path):
+    from scanner.engine import warm_start_shared_scan
+    warm_start_shared_scan(scan_pages) # First load of this process: show the last saved snapshot instead of an empty page
 if st.sidebar.button("🚀 Buscar Dados"):
-    # Clear previous data from session state to ensure freshness
-    st.session_state.pop('top_coins_data', None)
-    st.session_state.pop('coins_df', None)
-    st.session_state.pop('news_cache', None)  # Clear news cache on new data fetch
-    st.session_state.pop('data_fetched_time_utc', None)
-
     if api_key:
-        with st.spinner("Buscando dados do CoinGecko..."):
-            top_coins_result = get_top_gainers(api_key)
-
-        if top_coins_result:
-            st.session_state.top_coins_data = top_coins_result
-            st.session_state.data_fetched_time_utc = datetime.utcnow()
-
-            coins_data_processed = []
-            with st.spinner("Buscando informações de pares da Binance..."):
-                tradable_usdt_pairs = get_binance_tradable_usdt_pairs()
-
-            with st.spinner("Verificando moedas na Binance e processando dados..."):
-                for coin in st.session_state.top_coins_data:
-                    coin_symbol_upper = coin.get('symbol', 'N/A').upper()
-                    binance_data = check_binance_data(coin_symbol_upper, tradable_usdt_pairs)
-                    coins_data_processed.append({
-                        "Nome": coin.get('name', 'N/A'),
-                        "Símbolo": coin_symbol_upper,
-                        "Preço CoinGecko (USD)": (
-                            f"${coin.get('current_price', 0):.8f}" 
-                            if coin.get('current_price', 0) < 0.01 
-                            else f"${coin.get('current_price', 0):,.4f}"
-                        ),
-                        "% Subida (24h)": f"{coin.get('price_change_percentage_24h_in_currency', 0):.2f}%",
-                        "Status Binance": binance_data['status_binance'],
-                        "Preço Binance (USD)": binance_data['price_binance'],
-                        "Volume Binance (24h)": binance_data['volume_binance'],
-                    })
-            st.session_state.coins_df = pd.DataFrame(coins_data_processed)
-            st.success("Dados do CoinGecko e Binance processados!")
-        # Error messages from get_top_gainers are displayed within the function
+        from scanner.engine import revalidate_shared_scan
+        st.session_state.scan_requested = True
+        revalidation = revalidate_shared_scan(api_key, scan_pages)
+        # With older data to show, wait only briefly; otherwise there is nothing else to render
+        has_fallback = snapshot_cache.peek(snapshot_key) is not None
+        with st.spinner("Buscando dados do CoinGecko e da Binance..."):
+            try:
+                scan_result = revalidation.result(timeout=SNAPSHOT_REVALIDATE_WAIT_SECONDS if has_fallback else None)
+            except FutureTimeoutError:
+                scan_result = None
+                st.info("A atualização continua em segundo plano; exibindo os últimos dados válidos.")
+            except Exception as e:
+                scan_result = ScanResult(None, (ScanError("scan", "error", f"A busca foi interrompida: {e}"),))
+        if scan_result is not None:
+            show_scan_errors(scan_result.errors)
+            if scan_result.ok:
+                st.success("Dados do CoinGecko e Binance processados!")
     else:
         st.sidebar.warning("API Key é obrigatória!")
+elif api_key and (st.session_state.get('scan_requested') or getattr(snapshot_cache.peek(snapshot_key), 'restored', False)):
+    from scanner.engine import revalidate_shared_scan
+    revalidate_shared_scan(api_key, scan_pages) # Refreshes in the background once the snapshot is older than the TTL
+
+# Adopt the newest shared snapshot for this scan depth (e.g. one published by the refresher).
+# This is a dictionary lookup, so page loads and reruns never block on the upstream APIs.
+latest_snapshot = snapshot_cache.peek(snapshot_key)
+if latest_snapshot is not None and (
+    st.session_state.get('data_fetched_time_utc') is None
+    or latest_snapshot.fetched_at_utc > st.session_state.data_fetched_time_utc
+):
+    st.session_state.previous_snapshot = st.session_state.get('snapshot') # Baseline of the rank-change arrows
+    st.session_state.snapshot = latest_snapshot
+    st.session_state.data_fetched_time_utc = latest_snapshot.fetched_at_utc
+
+# --- Live Mode ---
+live_mode = st.sidebar.toggle(
+    "🔴 Modo ao vivo",
+    help=f"Verifica o snapshot compartilhado a cada {LIVE_REFRESH_SECONDS:g}s e redesenha a tabela só quando há dados novos.",
+)
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_ticker():
+    """
+    Polls the shared cache on a timer. Only this caption is re-sent on each tick; the page
+    reruns (adopting the snapshot above and re-sending the table) only when newer data exists.
+    """
+    if api_key:
+        from scanner.engine import revalidate_shared_scan
+        revalidate_shared_scan(api_key, scan_pages) # Background refresh once the snapshot passes its TTL
+    newest = snapshot_cache.peek(snapshot_key)
+    if newest is not None and (
+        st.session_state.get('data_fetched_time_utc') is None
+        or newest.fetched_at_utc > st.session_state.data_fetched_time_utc
+    ):
+        st.rerun()
+    st.caption(f"🔴 Ao vivo · verificado às {datetime.utcnow().strftime('%H:%M:%S')} UTC")
+
+# --- Main Display Area ---
+# Each section is a fragment: interacting with a widget inside one (the window selector, the
+# news button) reruns only that function, so the rest of the page (instructions, sidebar,
+# and the other section's table/chart) is neither re-executed nor re-sent to the browser.
+@st.fragment
+def results_section(snapshot):
+    """Window selector, results table, chart and CSV export for one snapshot."""
+    from scanner.engine import multi_window_df, rank_changes, window_gainers_df, window_label
+    # Every window comes from the same snapshot, so switching re-ranks locally without an API call
+    ranking_window = st.radio(
+        "Janela de variação",
+        options=[*RANKING_WINDOWS, COMBINED_WINDOW],
+        index=RANKING_WINDOWS.index(DEFAULT_WINDOW),
+        format_func=lambda window: window if window == COMBINED_WINDOW else window_label(window),
+        horizontal=True,
+    )
+    if ranking_window == COMBINED_WINDOW:
+        df_to_display = multi_window_df(snapshot)
+    else:
+        df_to_display = window_gainers_df(snapshot, ranking_window)
+        previous_snapshot = st.session_state.get('previous_snapshot')
+        if previous_snapshot is not None and previous_snapshot.market_df is not snapshot.market_df:
+            df_to_display.insert(
+                df_to_display.columns.get_loc('Símbolo') + 1, "Δ Posição",
+                rank_changes(df_to_display, window_gainers_df(previous_snapshot, ranking_window)),
+            )
+    if binance_stream is not None and binance_stream.is_fresh():
+        from scanner.stream import apply_live_binance_prices
+        df_to_display = apply_live_binance_prices(df_to_display, binance_stream.table)
+    # The news section lists whatever this section last showed
+    st.session_state.displayed_coins = dict(zip(df_to_display['Nome'], df_to_display['Símbolo']))
+
+    if ranking_window == COMBINED_WINDOW:
+        window_labels = [window_label(window) for window in RANKING_WINDOWS]
+        st.subheader(f"🏆 Ranking Combinado ({', '.join(window_labels[:-1])} e {window_labels[-1]})")
+        st.caption("Ordenado pela posição média da moeda no ranking de subida de cada janela, "
+                   "em % das moedas classificadas nela (0% = topo).")
+    else:
+        st.subheader(f"🏆 Top 10 Moedas com Maior Subida ({window_label(ranking_window)})")
+    if snapshot.restored:
+        restored_age = format_age((datetime.utcnow() - snapshot.fetched_at_utc).total_seconds())
+        refresh_note = " Atualizando em segundo plano." if snapshot_cache.is_revalidating(snapshot_key) else ""
+        st.info(f"💾 Exibindo os últimos dados salvos, obtidos há {restored_age}.{refresh_note}")
+    st.caption(f"📅 Dados obtidos em: {snapshot.fetched_at_utc.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+    show_snapshot_status(snapshot.fetched_at_utc, snapshot_key)
 
-# --- Main Display Area (conditionally shown if data is in session state) ---
-if 'coins_df' in st.session_state and st.session_state.coins_df is not None and not st.session_state.coins_df.empty:
-    df_to_display = st.session_state.coins_df
-    raw_top_coins_for_chart_news = st.session_state.top_coins_data
-
-    st.subheader("🏆 Top 10 Moedas com Maior Subida (24h)")
-    if 'data_fetched_time_utc' in st.session_state:
-        st.caption(f"📅 Dados obtidos em: {st.session_state.data_fetched_time_utc.strftime('%Y-%m-%d %H:%M:%S')} UTC")
-    
-    st.dataframe(df_to_display.set_index('Nome'), use_container_width=True)
+    st.dataframe(df_to_display.set_index('Nome'), column_config=coins_column_config(df_to_display), use_container_width=True)
 
     # --- Bar Chart of Top Gainers ---
-    st.subheader("📈 Gráfico de Variação Percentual (24h)")
-    
-    chart_values = []
-    chart_symbols = []
-    if raw_top_coins_for_chart_news: # Check if the list of coins is not None and not empty
-        for coin in raw_top_coins_for_chart_news:
-            percentage_change_val = coin.get('price_change_percentage_24h_in_currency')
-            # Ensure it's a number and finite. get_top_gainers should already ensure it's not None.
-            if isinstance(percentage_change_val, (int, float)) and math.isfinite(percentage_change_val):
-                chart_values.append(percentage_change_val)
-                chart_symbols.append(coin.get('symbol', 'N/A').upper())
-            # else: # Optional: log coins skipped due to invalid data for debugging
-            #     print(f"Skipping coin {coin.get('symbol')} for chart due to invalid percentage change: {percentage_change_val}")
-
-    if chart_values: # If we have valid, finite values to plot
-        chart_df_final = pd.DataFrame({
-            'Símbolo': chart_symbols,
-            '% Subida (24h)': chart_values
-        }).set_index('Símbolo')
-
-        # Ensure the DataFrame is not empty after potential filtering and has the required column
-        if not chart_df_final.empty and '% Subida (24h)' in chart_df_final.columns:
-            # Explicitly cast to float and ensure it's a numeric type for the chart
-            chart_df_final['% Subida (24h)'] = pd.to_numeric(chart_df_final['% Subida (24h)'], errors='coerce')
-            chart_df_final.dropna(subset=['% Subida (24h)'], inplace=True) # Remove rows where conversion failed
-
-            if not chart_df_final.empty:
-                # st.caption("Dados para o gráfico:") # Optional: keep if you want to see the df
-                # st.dataframe(chart_df_final) 
-
-                # Ensure the DataFrame is sorted for a visually appealing horizontal bar chart
-                # Typically, for horizontal bars, you might want the highest value at the top.
-                # Altair sorts by y-axis encoding by default if not specified otherwise.
-                # Let's sort by '% Subida (24h)' descending to have the largest bar at the top.
-                chart_df_final_sorted = chart_df_final.sort_values(by='% Subida (24h)', ascending=False)
-
-                chart = alt.Chart(chart_df_final_sorted.reset_index()).mark_bar().encode(
-                    x=alt.X('% Subida (24h):Q', title='% Subida (24h)', axis=alt.Axis(format='%', labelAngle=0)),
-                    y=alt.Y('Símbolo:N', title='Símbolo', sort='-x'), # Sort by the x-value (descending)
-                    tooltip=['Símbolo:N', alt.Tooltip('% Subida (24h):Q', format='.2f')] # Tooltip with 2 decimal places
-                ).properties(
-                    title='Top 10 Moedas por Variação % (24h)',
-                    height=alt.Step(40) # Controls bar thickness and spacing; adjust as needed
-                ).configure_axis(
-                    grid=False # Cleaner look without grid lines
-                ).configure_view(
-                    strokeWidth=0 # Remove border around the chart
-                )
+    if ranking_window != COMBINED_WINDOW:
+        st.subheader(f"📈 Gráfico de Variação Percentual ({window_label(ranking_window)})")
+
+        with stage("chart"):
+            from scanner.charts import gainers_chart # altair loads with the first chart
+            chart = gainers_chart(df_to_display, ranking_window)
+            if chart is not None:
                 st.altair_chart(chart, use_container_width=True)
-            else:
-                st.info("Não há dados numéricos válidos para exibir no gráfico após a conversão.")
-        else:
-            st.info("Não há dados válidos de variação percentual para exibir no gráfico após a filtragem.")
-    else:
-        # This handles cases where raw_top_coins_for_chart_news was empty, None, or all items had invalid/non-finite percentages
-        st.info("Não há dados válidos para exibir no gráfico de variação percentual.")
-    
+        if chart is None:
+            st.info("Não há dados válidos para exibir no gráfico de variação percentual.")
+
     # Optional: Export to CSV
     csv_export_data = df_to_display.to_csv(index=False).encode('utf-8')
     current_time_utc_file = datetime.utcnow() # For filename uniqueness
-    csv_filename = f"top_10_gainers_{current_time_utc_file.strftime('%Y%m%d_%H%M%S')}.csv"
+    csv_filename = f"top_10_gainers_{ranking_window.lower()}_{current_time_utc_file.strftime('%Y%m%d_%H%M%S')}.csv"
     st.download_button(
         label="📥 Exportar para CSV",
         data=csv_export_data,
@@ -468,37 +369,43 @@ if 'coins_df' in st.session_state and st.session_state.coins_df is not None and
         mime='text/csv',
     )
 
-    # --- Brave Search Context Section ---
+@st.fragment
+def news_section():
+    """Brave Search results for the coins currently listed by results_section."""
     st.subheader("🔎 Contexto Web (Brave Search)")
-    if brave_api_key: # brave_api_key is globally defined from sidebar input
-        if st.button("📰 Buscar Notícias para Moedas Listadas (Brave)"):
-            if 'news_cache' not in st.session_state:
-                st.session_state.news_cache = {}
+    if not brave_api_key: # brave_api_key is globally defined from sidebar input
+        st.info("Configure a Brave Search API Key na barra lateral para buscar notícias.")
+        return
+    if st.button("📰 Buscar Notícias para Moedas Listadas (Brave)"):
+        from scanner.brave import fetch_brave_news_concurrently, get_cached_brave_search_news
+        # One placeholder per coin keeps the expanders in table order while results arrive out of order
+        coin_symbols = st.session_state.get('displayed_coins', {})
+        news_placeholders = {coin_name: st.empty() for coin_name in coin_symbols}
+        coins_to_fetch = []
+        for coin_name, placeholder in news_placeholders.items():
+            cached_result = get_cached_brave_search_news(coin_name) # Served without calling Brave
+            if cached_result:
+                with placeholder.container():
+                    render_news_result(coin_symbols[coin_name], coin_name, cached_result)
+            else:
+                placeholder.caption(f"⏳ Buscando notícias para {coin_symbols[coin_name]} ({coin_name})...")
+                coins_to_fetch.append(coin_name)
 
+        def show_news_result(coin_name, news_result):
+            with news_placeholders[coin_name].container():
+                if "warning" in news_result: # Inline: a fragment rerun can't write to the sidebar
+                    st.warning(news_result["warning"])
+                render_news_result(coin_symbols[coin_name], coin_name, news_result)
+
+        if coins_to_fetch:
             with st.spinner("Buscando notícias no Brave Search..."):
-                for index, row in df_to_display.iterrows(): # Iterate over the DataFrame from session state
-                    coin_name_for_search = row['Nome'] 
-                    if coin_name_for_search not in st.session_state.news_cache or not st.session_state.news_cache[coin_name_for_search]:
-                        news_result = get_brave_search_news(coin_name_for_search, brave_api_key, count=3)
-                        st.session_state.news_cache[coin_name_for_search] = news_result
-                        time.sleep(1.1)  # Respect Brave API rate limit (1 req/sec)
-                    else:
-                        news_result = st.session_state.news_cache[coin_name_for_search]
-                    
-                    with st.expander(f"Notícias para {row['Símbolo']} ({coin_name_for_search})"):
-                        if "news" in news_result and news_result["news"]:
-                            for item in news_result["news"]:
-                                st.markdown(f"**[{item['title']}]({item['url']})** - *{item['source']}*", unsafe_allow_html=True)
-                                st.caption(item['snippet'])
-                                st.markdown("---")
-                        elif "message" in news_result:
-                            st.info(news_result["message"])
-                        elif "error" in news_result:
-                            st.error(news_result["error"])
-                        else:
-                            st.info(f"Nenhuma informação de notícias para {coin_name_for_search}.")
-    else:
-        st.info("Configure a Brave Search API Key na barra lateral para buscar notícias.")
+                asyncio.run(fetch_brave_news_concurrently(coins_to_fetch, brave_api_key, brave_rate_limit_rps_in_use, show_news_result))
+
+if live_mode:
+    live_ticker()
+if st.session_state.get('snapshot') is not None:
+    results_section(st.session_state.snapshot)
+    news_section()
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("Desenvolvido por VarelAI.")
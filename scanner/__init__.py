@@ -0,0 +1,43 @@
+"""
+Crypto Coin Scanner engine.
+
+Headless fetch, ranking and caching logic used by the Streamlit app (app.py) and the
+command line (`python -m scanner`).
+
+The names below are resolved on first access, so `import scanner` stays cheap: pandas,
+requests and the HTTP clients load only once something from the engine is used.
+"""
+import importlib
+
+_EXPORTS = {
+    "COINS_NUMERIC_COLUMNS": "engine",
+    "MarketSnapshot": "models",
+    "ScanError": "models",
+    "ScanResult": "models",
+    "build_coins_df": "engine",
+    "get_snapshot_cache": "cache",
+    "multi_window_df": "engine",
+    "rank_changes": "engine",
+    "revalidate_shared_scan": "engine",
+    "run_scan": "engine",
+    "run_shared_scan": "engine",
+    "snapshot_cache_key": "cache",
+    "warm_start_shared_scan": "engine",
+    "window_gainers_df": "engine",
+    "window_label": "engine",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_EXPORTS])
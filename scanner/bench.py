@@ -0,0 +1,159 @@
+"""
+End-to-end scan latency benchmark against the local mock upstreams.
+
+Each run is a full run_scan (CoinGecko fetch -> Binance pairs and rolling windows -> rank
+-> Binance enrichment -> DataFrame) followed by building and serializing the chart spec,
+timed per stage with scanner.timing. The upstreams' rate limiters keep their configured
+budgets, and the time spent waiting for them is reported as its own row
+("rate_limit_wait"); --no-rate-limits measures the pipeline alone. Results are
+p50/p95/p99 per stage and universe size, saved as JSON so two runs can be compared for
+regressions:
+
+    python -m scanner bench --output before.json
+    python -m scanner bench --output after.json --baseline before.json
+"""
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .binance import get_rolling_changes_cache, get_tradable_pairs_cache
+from .charts import gainers_chart
+from .config import COINGECKO_MAX_PAGES, COINGECKO_PER_PAGE
+from .engine import run_scan
+from .metrics import RATE_LIMIT_WAIT
+from .mocks import MockUpstreamServer, SyntheticMarket, point_upstreams_at
+from .ratelimit import get_rate_limiters
+from .timing import collect_stage_timings, stage
+
+DEFAULT_SIZES = (200, 2000, 15000)
+STAGES = (
+    "coingecko_fetch", "binance_pairs", "binance_rolling", "rank", "binance_enrich", "dataframe", "chart", "total",
+    "rate_limit_wait", # Time requests spent blocked on the upstreams' budgets, summed over concurrent requests
+)
+PERCENTILES = (50, 95, 99)
+
+
+def pages_for(size):
+    """CoinGecko pages needed to cover a universe of `size` coins."""
+    return max(1, min(math.ceil(size / COINGECKO_PER_PAGE), COINGECKO_MAX_PAGES))
+
+
+def timed_scan(pages):
+    """One instrumented pipeline run: ({stage: seconds}, ScanResult)."""
+    waited = sum(RATE_LIMIT_WAIT.value(upstream=upstream) for upstream in ("coingecko", "binance"))
+    with collect_stage_timings() as timings:
+        start = time.perf_counter()
+        result = run_scan("bench", pages)
+        if result.ok:
+            with stage("chart"):
+                chart = gainers_chart(result.snapshot.coins_df)
+                if chart is not None:
+                    chart.to_dict() # What st.altair_chart serializes
+        timings["total"] = time.perf_counter() - start
+    timings["rate_limit_wait"] = sum(RATE_LIMIT_WAIT.value(upstream=upstream) for upstream in ("coingecko", "binance")) - waited
+    return timings, result
+
+
+def summarize(samples):
+    """{stage: {"p50_ms", "p95_ms", "p99_ms", "mean_ms"}} from a list of per-run timing dicts."""
+    summary = {}
+    for name in STAGES:
+        values = np.array([sample.get(name, 0.0) for sample in samples]) * 1000
+        summary[name] = {f"p{p}_ms": round(float(np.percentile(values, p)), 3) for p in PERCENTILES}
+        summary[name]["mean_ms"] = round(float(values.mean()), 3)
+    return summary
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, runs=20, warmup=2, latency_ms=0.0, jitter_ms=0.0, seed=42, rate_limits=True,
+                  log=sys.stderr):
+    """
+    Benchmarks every universe size against one mock server and returns the results document.
+    With `rate_limits` off, the limiters are unbudgeted so only the pipeline itself is measured.
+    """
+    server = MockUpstreamServer(latency_ms=latency_ms, jitter_ms=jitter_ms, seed=seed).start()
+    point_upstreams_at(server.url) # Before the first request, so the shared session pools the mock host
+    pairs_cache = get_tradable_pairs_cache()
+    pairs_cache.path = os.path.join(tempfile.mkdtemp(prefix="scanner-bench-"), "binance_usdt_pairs.json")
+    if not rate_limits:
+        for limiter in get_rate_limiters().values():
+            limiter.set_budget()
+
+    results = {}
+    try:
+        for size in sizes:
+            server.market = SyntheticMarket(size, seed=seed)
+            pairs_cache.clear() # The pair list belongs to the previous universe
+            get_rolling_changes_cache().clear() # Warmup runs fetch them; measured runs reuse them like a live process
+            pages = pages_for(size)
+            samples, failed_runs = [], 0
+            for run in range(warmup + runs):
+                timings, result = timed_scan(pages)
+                if run < warmup:
+                    continue
+                samples.append(timings)
+                failed_runs += not result.ok
+            results[str(size)] = {
+                "pages": pages,
+                "runs": runs,
+                "failed_runs": failed_runs,
+                "stages": summarize(samples),
+            }
+            total = results[str(size)]["stages"]["total"]
+            wait = results[str(size)]["stages"]["rate_limit_wait"]
+            print(f"{size:>6} coins: total p50 {total['p50_ms']:.1f} ms, p95 {total['p95_ms']:.1f} ms, "
+                  f"p99 {total['p99_ms']:.1f} ms (rate limit wait p50 {wait['p50_ms']:.1f} ms)", file=log)
+    finally:
+        server.stop()
+
+    return {
+        "meta": {
+            "created_at_utc": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": runs,
+            "warmup": warmup,
+            "latency_ms": latency_ms,
+            "jitter_ms": jitter_ms,
+            "seed": seed,
+            "rate_limits": rate_limits,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Lines comparing p50/p95 of every stage and size present in both documents, and
+    whether the total p50 of any size got slower by more than `threshold`.
+    """
+    lines, regressed = [], False
+    for size, entry in current["results"].items():
+        base_entry = baseline["results"].get(size)
+        if base_entry is None:
+            continue
+        lines.append(f"{size} coins")
+        for name in STAGES:
+            now, before = entry["stages"][name], base_entry["stages"].get(name)
+            if before is None:
+                continue
+            cells = []
+            for p in ("p50_ms", "p95_ms"):
+                change = (now[p] - before[p]) / before[p] if before[p] else 0.0
+                cells.append(f"{p[:3]} {before[p]:9.2f} -> {now[p]:9.2f} ms ({change:+6.1%})")
+            flag = ""
+            if name == "total" and before["p50_ms"] and now["p50_ms"] > before["p50_ms"] * (1 + threshold):
+                flag, regressed = "  REGRESSION", True
+            lines.append(f"  {name:<16}" + "   ".join(cells) + flag)
+    return lines, regressed
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
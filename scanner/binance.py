@@ -0,0 +1,423 @@
+"""Binance helpers: tradable USDT pairs (cached process-wide), bulk 24h tickers and rolling-window tickers."""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .config import (
+    BINANCE_MAX_WORKERS, BINANCE_PAIRS_TTL_SECONDS, BINANCE_ROLLING_BATCH_LIMIT, BINANCE_ROLLING_TTL_DIVISOR,
+    BINANCE_ROLLING_WEIGHT_SHARE, BINANCE_TICKER_BATCH_LIMIT, CACHE_DIR,
+)
+from .http_client import http_get
+from .metrics import record_cache_lookup
+from .models import ScanError
+from .ratelimit import WEIGHT_SAFETY, get_rate_limiter
+from .util import process_singleton
+
+
+def fetch_binance_tradable_usdt_pairs():
+    """Downloads /exchangeInfo and returns the set of USDT pairs currently trading. Raises on failure."""
+    response = http_get("binance", "/api/v3/exchangeInfo", weight=20, timeout=(3.05, 10))
+    response.raise_for_status()
+    data = response.json()
+    return {
+        s['symbol'] for s in data['symbols']
+        if s['quoteAsset'] == 'USDT' and s['status'] == 'TRADING'
+    }
+
+
+class TradablePairsCache:
+    """
+    Process-wide cache of the Binance USDT pair set, persisted to disk so a restart
+    warm-starts from the last download. Once the TTL expires the stale set keeps being
+    served while a single background thread downloads /exchangeInfo again.
+    """
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pairs = None
+        self._fetched_at = 0.0 # Epoch seconds, so the age survives restarts
+        self._refreshing = False
+        self._load_from_disk()
+
+    def _load_from_disk(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                stored = json.load(f)
+            self._pairs = set(stored["symbols"])
+            self._fetched_at = float(stored["fetched_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass # No usable file yet: the first get() downloads synchronously
+
+    def _save_to_disk(self, pairs, fetched_at):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": fetched_at, "symbols": sorted(pairs)}, f)
+            os.replace(tmp_path, self.path) # Atomic, readers never see a half-written file
+        except OSError:
+            pass # Persistence is best effort; the in-memory copy is still valid
+
+    def _store(self, pairs):
+        fetched_at = time.time()
+        with self._lock:
+            self._pairs = pairs
+            self._fetched_at = fetched_at
+        self._save_to_disk(pairs, fetched_at)
+
+    def _refresh_in_background(self):
+        try:
+            self._store(fetch_binance_tradable_usdt_pairs())
+        except Exception:
+            pass # Keep serving the stale set; the next get() after this retries
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def clear(self):
+        """Forgets the in-memory set, so the next get() downloads again (the file is overwritten then)."""
+        with self._lock:
+            self._pairs = None
+            self._fetched_at = 0.0
+
+    def get(self):
+        """Returns the pair set, downloading it synchronously only when nothing is cached yet."""
+        with self._lock:
+            pairs = self._pairs
+            expired = time.time() - self._fetched_at >= self.ttl
+            start_refresh = pairs is not None and expired and not self._refreshing
+            if start_refresh:
+                self._refreshing = True
+        record_cache_lookup("binance_pairs", "miss" if pairs is None else "stale" if expired else "hit")
+        if pairs is None:
+            pairs = fetch_binance_tradable_usdt_pairs() # Raises on failure, handled by the caller
+            self._store(pairs)
+        elif start_refresh:
+            threading.Thread(target=self._refresh_in_background, name="binance-pairs-refresh", daemon=True).start()
+        return pairs
+
+
+@process_singleton
+def get_tradable_pairs_cache():
+    """The TradablePairsCache shared by every caller in this process."""
+    return TradablePairsCache(os.path.join(CACHE_DIR, "binance_usdt_pairs.json"), BINANCE_PAIRS_TTL_SECONDS)
+
+
+def get_binance_tradable_usdt_pairs(errors):
+    """Returns all USDT trading pairs on Binance from the process-wide cache (empty set on error)."""
+    try:
+        return get_tradable_pairs_cache().get()
+    except requests.exceptions.RequestException as e:
+        errors.append(ScanError("binance", "warning", f"⚠️ Erro ao buscar pares da Binance: {e}. Verificação da Binance pode falhar."))
+    except Exception as e:
+        errors.append(ScanError("binance", "warning", f"⚠️ Erro inesperado ao processar pares da Binance: {e}."))
+    return set()
+
+
+def ticker_24h_weight(symbol_count):
+    """Request weight of /ticker/24hr for `symbol_count` symbols (None: the whole market)."""
+    if symbol_count is None or symbol_count > 100:
+        return 80
+    return 2 if symbol_count <= 20 else 40
+
+
+def fetch_binance_24h_tickers(binance_symbols=None):
+    """
+    Fetches MINI 24h tickers in one /ticker/24hr call: a symbols=[...] batch for up to
+    BINANCE_TICKER_BATCH_LIMIT symbols, otherwise the whole market. Raises on failure.
+    """
+    params = {"type": "MINI"} # MINI still carries lastPrice and quoteVolume, at a fraction of the payload
+    symbol_count = None
+    if binance_symbols and len(binance_symbols) <= BINANCE_TICKER_BATCH_LIMIT:
+        params["symbols"] = "[" + ",".join(f'"{symbol}"' for symbol in binance_symbols) + "]"
+        symbol_count = len(binance_symbols)
+    response = http_get("binance", "/api/v3/ticker/24hr", weight=ticker_24h_weight(symbol_count), params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_binance_ticker_index(binance_symbols, errors):
+    """
+    Fetches 24h tickers for all requested symbols in a single /ticker/24hr call and
+    returns a {symbol: ticker} index. Returns None if the bulk fetch fails.
+    """
+    binance_symbols = sorted(set(binance_symbols))
+    if not binance_symbols:
+        return {}
+    wanted = set(binance_symbols)
+
+    try:
+        return {
+            ticker['symbol']: ticker for ticker in fetch_binance_24h_tickers(binance_symbols)
+            if ticker.get('symbol') in wanted
+        }
+    except requests.exceptions.HTTPError as e:
+        errors.append(ScanError(
+            "binance", "warning", f"Erro HTTP {e.response.status_code} ao buscar tickers 24h da Binance.", e.response.status_code
+        ))
+    except requests.exceptions.RequestException:
+        errors.append(ScanError("binance", "warning", "Erro de conexão ao buscar tickers 24h da Binance."))
+    except Exception as e:
+        errors.append(ScanError("binance", "warning", f"Erro ao processar tickers 24h da Binance: {str(e)[:100]}"))
+    return None
+
+
+def rolling_window_size(window):
+    """/api/v3/ticker windowSize of a rolling window id (e.g. "15m-binance" -> "15m")."""
+    return window.removesuffix("-binance")
+
+
+ROLLING_UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400}
+
+
+def rolling_window_ttl(window):
+    """Seconds a rolling window's changes are reused: 1/BINANCE_ROLLING_TTL_DIVISOR of the window's length."""
+    size = rolling_window_size(window)
+    return int(size[:-1]) * ROLLING_UNIT_SECONDS[size[-1]] / BINANCE_ROLLING_TTL_DIVISOR
+
+
+class RollingChangesCache:
+    """
+    Process-wide cache of rolling-window changes by window and symbol. /api/v3/ticker
+    costs up to 200 weight per 100 symbols and window, so each symbol is only requested
+    again once its value is older than the window's TTL; scans of any depth share the
+    values. Expired values are still returned until a refresh succeeds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._changes = {} # window -> {symbol: (stored_at monotonic seconds, change or None)}
+        self._in_flight = set() # (window, symbol) being fetched by some scan
+
+    def claim(self, window, symbols, ttl):
+        """
+        The `symbols` whose change over `window` is missing or older than `ttl` seconds and
+        not already being fetched; the caller must store() or release() each of them.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._changes.get(window, {})
+            due = [
+                symbol for symbol in symbols
+                if (window, symbol) not in self._in_flight and (symbol not in cached or now - cached[symbol][0] >= ttl)
+            ]
+            self._in_flight.update((window, symbol) for symbol in due)
+        return due
+
+    def store(self, window, symbols, changes):
+        """Records `changes` ({symbol: change}) for a fetched batch; requested symbols without one are stored as None."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._changes.setdefault(window, {})
+            for symbol in symbols:
+                cached[symbol] = (now, changes.get(symbol))
+                self._in_flight.discard((window, symbol))
+
+    def release(self, window, symbols):
+        """Gives up claimed symbols without a value (their fetch failed), so the next scan retries them."""
+        with self._lock:
+            self._in_flight.difference_update((window, symbol) for symbol in symbols)
+
+    def clear(self):
+        with self._lock:
+            self._changes.clear()
+            self._in_flight.clear()
+
+    def lookup(self, window, symbols):
+        """{symbol: change} of every symbol with a known change over `window`, regardless of age."""
+        with self._lock:
+            cached = self._changes.get(window, {})
+            return {
+                symbol: cached[symbol][1] for symbol in symbols
+                if symbol in cached and cached[symbol][1] is not None
+            }
+
+
+@process_singleton
+def get_rolling_changes_cache():
+    """The RollingChangesCache shared by every scan in this process."""
+    return RollingChangesCache()
+
+
+def rolling_ticker_weight(symbol_count):
+    """Request weight of /api/v3/ticker: 4 per symbol, capped at 200 per request."""
+    return min(4 * symbol_count, 200)
+
+
+def fetch_binance_rolling_tickers(binance_symbols, window):
+    """
+    Fetches MINI rolling-window tickers of up to BINANCE_ROLLING_BATCH_LIMIT symbols in one
+    /api/v3/ticker call. Runs inside worker threads, so errors are returned to the caller instead of raised.
+    """
+    params = {
+        "windowSize": rolling_window_size(window),
+        "type": "MINI", # openPrice and lastPrice are all the change needs
+        "symbols": "[" + ",".join(f'"{symbol}"' for symbol in binance_symbols) + "]",
+    }
+    try:
+        response = http_get("binance", "/api/v3/ticker", weight=rolling_ticker_weight(len(binance_symbols)), params=params)
+        response.raise_for_status()
+        return response.json(), None
+    except Exception as e: # Reported by get_binance_rolling_changes
+        return None, e
+
+
+def rolling_change(ticker):
+    """Percent change over the ticker's window, from its open and last price (None when unusable)."""
+    try:
+        open_price, last_price = float(ticker['openPrice']), float(ticker['lastPrice'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return (last_price / open_price - 1) * 100 if open_price > 0 else None
+
+
+def _rolling_errors(failed_windows):
+    """One ScanError per rolling window whose batches failed, from {window: first error}."""
+    errors = []
+    for window, error in failed_windows.items():
+        size = rolling_window_size(window)
+        if isinstance(error, requests.exceptions.HTTPError):
+            errors.append(ScanError(
+                "binance", "warning", f"Erro HTTP {error.response.status_code} ao buscar variação de {size} da Binance.",
+                error.response.status_code
+            ))
+        elif isinstance(error, requests.exceptions.RequestException):
+            errors.append(ScanError("binance", "warning", f"Erro de conexão ao buscar variação de {size} da Binance."))
+        else:
+            errors.append(ScanError("binance", "warning", f"Erro ao processar variação de {size} da Binance: {str(error)[:100]}"))
+    return errors
+
+
+def refresh_rolling_changes(jobs, cache):
+    """
+    Fetches every (window, batch) job concurrently into `cache` and returns the ScanErrors
+    of the windows that failed. Batches are released from the cache's in-flight set either way.
+    """
+    failed_windows = {}
+    try:
+        with ThreadPoolExecutor(max_workers=min(len(jobs), BINANCE_MAX_WORKERS)) as executor:
+            futures = [executor.submit(fetch_binance_rolling_tickers, batch, window) for window, batch in jobs]
+            for (window, batch), future in zip(jobs, futures):
+                tickers, error = future.result()
+                if error is None:
+                    try:
+                        changes = {ticker.get('symbol'): rolling_change(ticker) for ticker in tickers}
+                    except Exception as e: # Unexpected payload shape
+                        error = e
+                if error is not None:
+                    failed_windows.setdefault(window, error)
+                    cache.release(window, batch)
+                    continue
+                cache.store(window, batch, changes)
+    except BaseException:
+        for window, batch in jobs:
+            cache.release(window, batch)
+        raise
+    return _rolling_errors(failed_windows)
+
+
+def rolling_weight_budget():
+    """Request weight a scan may spend on rolling tickers now: BINANCE_ROLLING_WEIGHT_SHARE of what is left this minute."""
+    limiter = get_rate_limiter("binance")
+    if not limiter.weight_limit:
+        return float("inf")
+    return (limiter.weight_limit * WEIGHT_SAFETY - limiter.used_weight) * BINANCE_ROLLING_WEIGHT_SHARE
+
+
+def get_binance_rolling_changes(binance_symbols, windows, errors):
+    """
+    Percent change of every symbol over each rolling window, as {window: {symbol: change}}.
+    Only symbols whose cached change has expired, and that no other scan is already
+    fetching, are requested (see RollingChangesCache). /api/v3/ticker takes one windowSize
+    and at most BINANCE_ROLLING_BATCH_LIMIT symbols per call, so the (window, batch) pairs
+    are fetched concurrently, within rolling_weight_budget(): batches beyond it keep their
+    older values until a later scan, so a scan never blocks on a whole Binance weight window.
+    """
+    binance_symbols = sorted(set(binance_symbols))
+    if not binance_symbols or not windows:
+        return {window: {} for window in windows}
+
+    cache = get_rolling_changes_cache()
+    budget = rolling_weight_budget()
+    jobs, deferred = [], False
+    for window in windows: # Configured order: the short windows, which expire first, go first
+        due = cache.claim(window, binance_symbols, rolling_window_ttl(window))
+        for start in range(0, len(due), BINANCE_ROLLING_BATCH_LIMIT):
+            batch = due[start:start + BINANCE_ROLLING_BATCH_LIMIT]
+            weight = rolling_ticker_weight(len(batch))
+            if weight > budget:
+                cache.release(window, batch)
+                deferred = True
+                continue
+            budget -= weight
+            jobs.append((window, batch))
+    if jobs:
+        errors.extend(refresh_rolling_changes(jobs, cache))
+    if deferred:
+        errors.append(ScanError(
+            "binance", "info",
+            "Parte das variações das janelas da Binance será atualizada nas próximas buscas (limite de peso da API)."
+        ))
+    return {window: cache.lookup(window, binance_symbols) for window in windows}
+
+
+def check_binance_data(coin_symbol, tradable_usdt_pairs, ticker_index, errors):
+    """
+    Checks coin availability on Binance and looks up price and 24h volume.
+    Uses a pre-fetched set of tradable USDT pairs and the bulk ticker index from get_binance_ticker_index.
+    Price and volume are returned as floats (None when unavailable); formatting happens at display time.
+    """
+    binance_symbol_usdt = f"{coin_symbol.upper()}USDT"
+    
+    default_error_result = {
+        "status_binance": "⚠️ Erro Verificação",
+        "price_binance": None,
+        "volume_binance": None
+    }
+
+    if tradable_usdt_pairs is None or not isinstance(tradable_usdt_pairs, set):
+        return {
+            "status_binance": "❌ Verif. Indisponível",
+            "price_binance": None,
+            "volume_binance": None
+        }
+
+    if not tradable_usdt_pairs: # If the set is empty due to a fetch error
+        return {
+            "status_binance": "⚠️ Binance Indisponível", # Cannot check due to earlier error
+            "price_binance": None,
+            "volume_binance": None
+        }
+
+    if binance_symbol_usdt not in tradable_usdt_pairs:
+        return {
+            "status_binance": "❌ Não na Binance (USDT)",
+            "price_binance": None,
+            "volume_binance": None
+        }
+
+    if ticker_index is None: # Bulk ticker fetch failed, already reported in the sidebar
+        return {**default_error_result, "status_binance": "⚠️ Erro Conexão Binance"}
+
+    data = ticker_index.get(binance_symbol_usdt)
+    if data is None:
+        return {**default_error_result, "status_binance": f"❌ {coin_symbol.upper()} Não Listado (Ticker)"}
+
+    try:
+        price = float(data.get('lastPrice', 0))
+        volume_usdt = float(data.get('quoteVolume', 0)) # Volume in USDT
+
+        return {
+            "status_binance": "✅ Na Binance",
+            "price_binance": price,
+            "volume_binance": volume_usdt
+        }
+    except (TypeError, ValueError) as e:
+        errors.append(ScanError("binance", "warning", f"Erro ao processar dados de {binance_symbol_usdt} da Binance: {str(e)[:100]}"))
+        return {**default_error_result, "status_binance": "⚠️ Erro Dados Binance"}
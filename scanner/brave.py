@@ -0,0 +1,260 @@
+"""Brave Web Search news: fetching, the shared on-disk cache and the rate-limited async pipeline."""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import requests
+
+from .config import BRAVE_NEWS_FRESHNESS, CACHE_DIR, NEWS_CACHE_MAX_ENTRIES, NEWS_TTL_BY_FRESHNESS
+from .http_client import http_get
+from .metrics import record_cache_lookup
+from .ratelimit import get_brave_key_limiters
+from .timing import stage
+from .util import process_singleton
+
+
+def brave_news_query(coin_name):
+    """Search query used for a coin's news; also the basis of its news cache key."""
+    return f'{coin_name} coin news' # More specific query including 'coin'
+
+
+def get_brave_search_news(coin_name, b_api_key, count=3, freshness=BRAVE_NEWS_FRESHNESS, limiter=None):
+    """Fetches news for a coin using Brave Web Search API, paced by `limiter` (default: the shared Brave limiter)."""
+    if not b_api_key:
+        return {"error": "Brave Search API Key não fornecida."}
+    if not coin_name:
+        return {"error": "Nome da moeda não fornecido."}
+
+    headers = {
+        "Accept": "application/json",
+        "X-Subscription-Token": b_api_key
+    }
+    # Updated parameters for Web Search API
+    params = {
+        "q": brave_news_query(coin_name),
+        "count": count,
+        "safesearch": "moderate",
+        "freshness": freshness
+        # No 'result_filter' means API returns all types (news, web, etc.)
+        # "country": "us", # Optional: specify country
+        # "search_lang": "en", # Optional: specify search language
+    }
+    try:
+        # Updated endpoint for Web Search API
+        response = http_get("brave", "/res/v1/web/search", limiter=limiter, headers=headers, params=params)
+        response.raise_for_status()
+        data = response.json()
+
+        # Attempt to parse 'news' results first, then 'web' results as a fallback
+        processed_items = []
+        
+        # 1. Try 'news' results from the 'news' field
+        news_specific_data = data.get('news', {}) 
+        news_specific_results = news_specific_data.get('results', [])
+
+        if news_specific_results:
+            for item in news_specific_results:
+                title = item.get('title', 'N/A')
+                url = item.get('url', '#')
+                snippet = item.get('description', item.get('snippet', 'N/A')) 
+                source = item.get('source', item.get('meta_url', {}).get('hostname', 'N/A')) 
+                processed_items.append({
+                    "title": title,
+                    "url": url,
+                    "snippet": snippet,
+                    "source": source
+                })
+        
+        # 2. If no 'news' specific results were found, try 'web' results from the 'web' field
+        if not processed_items:
+            general_web_data = data.get('web', {})
+            general_web_results = general_web_data.get('results', [])
+            if general_web_results:
+                # Optional: st.sidebar.info(f"Mostrando resultados web gerais para {coin_name}...")
+                for item in general_web_results:
+                    title = item.get('title', 'N/A')
+                    url = item.get('url', '#')
+                    snippet = item.get('description', item.get('snippet', 'N/A')) 
+                    source = item.get('source', item.get('meta_url', {}).get('hostname', 'N/A'))
+                    processed_items.append({
+                        "title": title,
+                        "url": url,
+                        "snippet": snippet,
+                        "source": source
+                    })
+
+        # 3. Return collected items if any, otherwise a 'not found' message
+        if processed_items:
+            return {"news": processed_items} # Keep the key "news" for consistency in display logic
+        else:
+            return {"message": f"Nenhuma notícia ou resultado web relevante encontrado para {coin_name} com os filtros atuais."}
+    except requests.exceptions.HTTPError as e:
+        error_message = f"Erro HTTP {e.response.status_code} com Brave Web Search API para {coin_name}."
+        if e.response.status_code == 401:
+            error_message += " Verifique sua Brave API Key."
+        elif e.response.status_code == 429:
+            error_message += " Limite de requisições da Brave API atingido."
+        elif e.response.status_code == 403:
+             error_message += " Acesso não autorizado à Brave API. Verifique sua subscrição ou endpoint."
+        return {"error": error_message, "warning": error_message}
+    except requests.exceptions.RequestException as e:
+        return {
+            "error": f"Erro de conexão com Brave Web Search API para {coin_name}.",
+            "warning": f"Erro de conexão com Brave Web Search API para {coin_name}: {e}"
+        }
+    except Exception as e: # Catch other potential errors like JSONDecodeError
+        return {
+            "error": f"Erro inesperado ao buscar notícias para {coin_name}.",
+            "warning": f"Erro inesperado ao buscar notícias para {coin_name} no Brave Web Search: {e}"
+        }
+
+
+def normalize_news_query(query):
+    """Case- and whitespace-insensitive form of a query, so equivalent searches share a cache entry."""
+    return " ".join(query.casefold().split())
+
+
+class NewsCache:
+    """
+    Disk-backed Brave results cache shared by every session and kept across restarts.
+    Entries are keyed by normalized query, freshness and result count, expire after the
+    TTL of their freshness window, and the least recently used ones are evicted once
+    the table grows past `max_entries`.
+    """
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL") # Readers don't block the writer
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS news_cache (
+                    query TEXT NOT NULL,
+                    freshness TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (query, freshness, count)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS news_cache_last_access ON news_cache (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the cache safe to use from any thread
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn: # Commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, query, freshness, count):
+        """Returns the cached result, or None when missing or older than the freshness TTL."""
+        key = (normalize_news_query(query), freshness, count)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result, stored_at FROM news_cache WHERE query = ? AND freshness = ? AND count = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= NEWS_TTL_BY_FRESHNESS.get(freshness, NEWS_TTL_BY_FRESHNESS["pd"]):
+                conn.execute("DELETE FROM news_cache WHERE query = ? AND freshness = ? AND count = ?", key)
+                return None
+            conn.execute(
+                "UPDATE news_cache SET last_access = ? WHERE query = ? AND freshness = ? AND count = ?", (now, *key)
+            )
+        return json.loads(row[0])
+
+    def put(self, query, freshness, count, result):
+        """Stores a result and evicts least recently used entries above the size cap."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO news_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_news_query(query), freshness, count, json.dumps(result), now, now)
+            )
+            conn.execute("""
+                DELETE FROM news_cache WHERE rowid IN (
+                    SELECT rowid FROM news_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+
+@process_singleton
+def get_news_cache():
+    """The NewsCache shared by every caller in this process."""
+    return NewsCache(os.path.join(CACHE_DIR, "news_cache.sqlite3"), NEWS_CACHE_MAX_ENTRIES)
+
+
+def get_cached_brave_search_news(coin_name, count=3, freshness=BRAVE_NEWS_FRESHNESS):
+    """Looks a coin's news up in the shared cache without calling Brave; None on a miss."""
+    news_result = get_news_cache().get(brave_news_query(coin_name), freshness, count)
+    record_cache_lookup("news", "miss" if news_result is None else "hit")
+    return news_result
+
+
+def fetch_and_cache_brave_search_news(coin_name, b_api_key, count=3, freshness=BRAVE_NEWS_FRESHNESS, limiter=None):
+    """Calls Brave and stores successful results (errors are never cached, so they are retried)."""
+    with stage("news_fetch"):
+        news_result = get_brave_search_news(coin_name, b_api_key, count=count, freshness=freshness, limiter=limiter)
+    if "error" not in news_result:
+        get_news_cache().put(brave_news_query(coin_name), freshness, count, news_result)
+    return news_result
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket for asyncio code: refills `rate` tokens per second up to `capacity`.
+    With the default capacity of 1, requests are spaced exactly 1/rate seconds apart,
+    which keeps us inside Brave's per-second windows without a fixed sleep.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock() # FIFO, so waiters are served in submission order
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def fetch_brave_news_concurrently(coin_names, b_api_key, rate, on_result, count=3):
+    """
+    Fetches news for every coin concurrently, paced by a token bucket at `rate` requests
+    per second. `on_result(coin_name, news_result)` is called on the event loop (the
+    script thread) as soon as each response arrives, so it may render Streamlit elements.
+    The bucket keeps this session's requests in order; the limiter of `b_api_key`, shared
+    by every session using that key, caps them together at `rate` and honours 429s.
+    """
+    limiter = get_brave_key_limiters().get(b_api_key, rate)
+    bucket = AsyncTokenBucket(rate)
+
+    async def fetch_one(coin_name):
+        await bucket.acquire()
+        # The blocking request runs in a worker thread through the shared pooled session
+        news_result = await asyncio.to_thread(
+            fetch_and_cache_brave_search_news, coin_name, b_api_key, count, limiter=limiter,
+        )
+        return coin_name, news_result
+
+    tasks = [asyncio.create_task(fetch_one(coin_name)) for coin_name in coin_names]
+    for next_done in asyncio.as_completed(tasks):
+        coin_name, news_result = await next_done
+        on_result(coin_name, news_result)
@@ -0,0 +1,206 @@
+"""Process-wide market snapshot cache with TTL and single-flight fetches."""
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from .config import SNAPSHOT_DIR
+from .metrics import REGISTRY, CallbackGauge, record_cache_lookup
+from .models import ScanError, ScanResult
+from .util import process_singleton
+
+FAILURE_BACKOFF_SECONDS = 5.0 # First pause after a failed revalidation; doubles per consecutive failure, capped at the TTL
+CALLER_FAILURE_STATUSES = (401, 403) # Rejected API key: a problem of the caller, not of the shared data
+
+
+def is_caller_failure(result):
+    """Whether a failed ScanResult was caused by the caller's own credentials rather than the upstream."""
+    return not result.ok and any(error.status_code in CALLER_FAILURE_STATUSES for error in result.errors)
+
+
+def _relay(source, target):
+    """Resolves Future `target` with the outcome of the finished Future `source`."""
+    try:
+        target.set_result(source.result())
+    except BaseException as e:
+        target.set_exception(e)
+
+
+class SnapshotCache:
+    """
+    Process-wide cache of market snapshots keyed by scan parameters.
+    Concurrent misses on the same key are coalesced (single-flight): the first caller
+    runs the upstream fetch and every other caller waits for and shares its result.
+    The last good snapshot is kept after failed fetches, so it can be served stale
+    while `revalidate()` refreshes it in the background; after a failure, revalidation
+    backs off instead of hitting the failing upstream on every call. Failures caused by
+    a caller's API key are neither shared with other callers nor recorded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {} # key -> (stored_at monotonic seconds, snapshot)
+        self._in_flight = {} # key -> Future resolved by the fetching caller
+        self._failures = {} # key -> (failed_at monotonic seconds, consecutive failures, errors) while fetches fail
+
+    def peek(self, key):
+        """Returns the latest snapshot for `key` regardless of age, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def ages(self):
+        """Seconds since each cached snapshot was stored, by key."""
+        now = time.monotonic()
+        with self._lock:
+            return {key: now - stored_at for key, (stored_at, _) in self._entries.items()}
+
+    def last_failure(self, key):
+        """Errors of the latest fetch for `key` if it failed (the cached snapshot is then stale), else ()."""
+        with self._lock:
+            failure = self._failures.get(key)
+        return failure[2] if failure else ()
+
+    def _backoff_remaining(self, key, ttl):
+        """Seconds until `key` may be revalidated again after failed fetches (0 when allowed). Caller holds the lock."""
+        failure = self._failures.get(key)
+        if failure is None:
+            return 0.0
+        failed_at, failures, _ = failure
+        delay = min(ttl, FAILURE_BACKOFF_SECONDS * 2 ** (failures - 1))
+        return max(0.0, failed_at + delay - time.monotonic())
+
+    def is_revalidating(self, key):
+        with self._lock:
+            return key in self._in_flight
+
+    def seed(self, key, snapshot, age):
+        """
+        Stores a snapshot obtained elsewhere (e.g. loaded from disk) unless `key` already has
+        one. `age` is its age in seconds, so TTLs still count from when it was fetched.
+        """
+        with self._lock:
+            if key in self._entries:
+                return False
+            self._entries[key] = (time.monotonic() - max(0.0, age), snapshot)
+            return True
+
+    def get_or_fetch(self, key, fetch, ttl):
+        """
+        Returns a ScanResult: the cached snapshot if younger than `ttl` seconds, otherwise the
+        result of `fetch()`, which runs once for all concurrent callers. Only successful
+        scans are stored, so the next caller after a failure retries.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                record_cache_lookup("snapshot", "hit")
+                return ScanResult(entry[1])
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            record_cache_lookup("snapshot", "miss" if is_leader else "hit") # Followers share a fetch instead of starting one
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_leader:
+            try:
+                result = future.result() # Followers see the leader's errors too
+            except BaseException: # The leading caller was interrupted; it reports its own error
+                return ScanResult(None, (ScanError("scan", "error", "A busca compartilhada foi interrompida. Tente novamente."),))
+            if is_caller_failure(result):
+                return self.get_or_fetch(key, fetch, ttl) # The leader's key was rejected; try with our own
+            return result
+        return self._lead_fetch(key, fetch, future)
+
+    def revalidate(self, key, fetch, ttl):
+        """
+        Non-blocking variant of get_or_fetch: returns a Future of the ScanResult. A snapshot
+        younger than `ttl` resolves it immediately; otherwise `fetch()` runs in a background
+        thread (or the fetch already in flight is joined, unless its key gets rejected), and
+        callers keep serving peek() meanwhile. Within the backoff after a failed fetch, it resolves to that failure's
+        errors without contacting the upstream.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                record_cache_lookup("snapshot", "hit")
+                future = Future()
+                future.set_result(ScanResult(entry[1]))
+                return future
+            record_cache_lookup("snapshot", "miss" if entry is None else "stale")
+            leader = self._in_flight.get(key)
+            future = Future()
+            if leader is None and self._backoff_remaining(key, ttl) > 0:
+                future.set_result(ScanResult(None, self._failures[key][2]))
+                return future
+            if leader is None:
+                self._in_flight[key] = future
+
+        if leader is not None:
+            def follow(leader):
+                if leader.exception() is None and is_caller_failure(leader.result()): # Retry with our own key
+                    self.revalidate(key, fetch, ttl).add_done_callback(lambda retry: _relay(retry, future))
+                else:
+                    _relay(leader, future)
+            leader.add_done_callback(follow)
+            return future
+
+        def run():
+            try:
+                self._lead_fetch(key, fetch, future)
+            except Exception:
+                pass # Delivered to the waiters through the future
+        threading.Thread(target=run, name="snapshot-revalidate", daemon=True).start()
+        return future
+
+    def _record_failure(self, key, errors):
+        """Counts a failed fetch of `key`, which starts (or lengthens) its revalidation backoff. Caller holds the lock."""
+        failures = self._failures.get(key, (0.0, 0, ()))[1] + 1
+        self._failures[key] = (time.monotonic(), failures, errors)
+
+    def _lead_fetch(self, key, fetch, future):
+        """Runs `fetch()` for every caller waiting on `future` and stores a successful snapshot."""
+        try:
+            result = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                if isinstance(e, Exception): # Not a caller interrupted mid-fetch (e.g. a Streamlit rerun)
+                    self._record_failure(key, (ScanError("scan", "error", f"A busca falhou: {e}"),))
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if result.snapshot is not None:
+                self._entries[key] = (time.monotonic(), result.snapshot)
+                self._failures.pop(key, None)
+            elif not is_caller_failure(result):
+                self._record_failure(key, result.errors)
+            self._in_flight.pop(key, None)
+        future.set_result(result)
+        return result
+
+
+@process_singleton
+def get_snapshot_cache():
+    """The SnapshotCache shared by every caller in this process."""
+    return SnapshotCache()
+
+
+REGISTRY.register(CallbackGauge(
+    "scanner_snapshot_age_seconds", "Seconds since each cached market snapshot was fetched.", ("key",),
+    lambda: {(":".join(map(str, key)),): age for key, age in get_snapshot_cache().ages().items()},
+))
+
+
+def snapshot_cache_key(pages):
+    """
+    Cache key for a scan. The API key is deliberately not part of it: market data is
+    the same for every caller, which is what lets sessions share one fetch.
+    """
+    return ("markets", pages)
+
+
+def snapshot_path(pages):
+    """File holding the latest saved snapshot for a scan depth, or None when SNAPSHOT_DIR is disabled."""
+    return os.path.join(SNAPSHOT_DIR, f"markets-{int(pages)}.parquet") if SNAPSHOT_DIR else None
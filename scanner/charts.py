@@ -0,0 +1,30 @@
+"""Chart specs for the results table."""
+import altair as alt
+
+from .config import DEFAULT_WINDOW
+from .engine import gain_column as window_gain_column, window_label
+
+
+def gainers_chart(coins_df, window=DEFAULT_WINDOW):
+    """Bar chart of the change over `window` per symbol, or None when there is nothing valid to plot."""
+    gain_column = window_gain_column(window)
+    # coins_df is already numeric, so the chart only needs to drop missing/non-finite values
+    chart_df = coins_df[['Símbolo', gain_column]]
+    chart_df = chart_df[chart_df[gain_column].abs() < float('inf')] # Also drops NaN
+    if chart_df.empty:
+        return None
+
+    # Sort by the change descending to have the largest bar at the top.
+    chart_df_sorted = chart_df.sort_values(by=gain_column, ascending=False)
+    return alt.Chart(chart_df_sorted).mark_bar().encode(
+        x=alt.X(f'{gain_column}:Q', title=gain_column, axis=alt.Axis(format='%', labelAngle=0)),
+        y=alt.Y('Símbolo:N', title='Símbolo', sort='-x'), # Sort by the x-value (descending)
+        tooltip=['Símbolo:N', alt.Tooltip(f'{gain_column}:Q', format='.2f')] # Tooltip with 2 decimal places
+    ).properties(
+        title=f'Top {len(chart_df)} Moedas por Variação % ({window_label(window)})',
+        height=alt.Step(40) # Controls bar thickness and spacing; adjust as needed
+    ).configure_axis(
+        grid=False # Cleaner look without grid lines
+    ).configure_view(
+        strokeWidth=0 # Remove border around the chart
+    )
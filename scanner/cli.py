@@ -0,0 +1,209 @@
+"""
+Command line entry point: `python -m scanner scan --pages 4 --format json`.
+
+Runs one headless scan and writes the results table as JSON, CSV or Parquet, so
+scans can be scheduled from cron or fed to other tools without the Streamlit UI.
+Successful scans are also appended to the snapshot history, which
+`python -m scanner history` exports by time range. `python -m scanner mocks` serves
+synthetic or recorded upstream APIs for offline runs, `python -m scanner bench`
+measures scan latency against them, and `python -m scanner startup` profiles the app's
+cold start.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from .config import COINGECKO_API_KEY, COINGECKO_MAX_PAGES, DEFAULT_SCAN_PAGES, DEFAULT_WINDOW, RANKING_WINDOWS
+from .engine import multi_window_df, run_recorded_scan, run_scan, window_gainers_df
+from .history import get_history_store
+from .http_client import get_http_session
+from .recording import install_recorder, install_replay
+
+
+def write_scan_result(result, output_format, output, window=DEFAULT_WINDOW):
+    """Writes a successful ScanResult's ranking for `window` ("combined" for all windows) to `output` (a path, or "-" for stdout)."""
+    snapshot = result.snapshot
+    coins_df = multi_window_df(snapshot) if window == "combined" else window_gainers_df(snapshot, window)
+    if output_format == "json":
+        payload = {
+            "fetched_at_utc": snapshot.fetched_at_utc.isoformat() + "Z",
+            "window": window,
+            "coins": json.loads(coins_df.to_json(orient="records", force_ascii=False)),
+            "errors": [error.to_dict() for error in result.errors],
+        }
+        text = json.dumps(payload, ensure_ascii=False, indent=2) + "\n"
+        if output == "-":
+            sys.stdout.write(text)
+        else:
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(text)
+    elif output_format == "csv":
+        coins_df.to_csv(sys.stdout if output == "-" else output, index=False)
+    elif output_format == "parquet":
+        if output == "-":
+            raise SystemExit("Parquet output needs --output PATH.")
+        coins_df.to_parquet(output, index=False) # Needs pyarrow (installed with streamlit)
+
+
+def cmd_scan(args):
+    if not args.api_key:
+        print("COINGECKO_API_KEY is not set (use --api-key or .env).", file=sys.stderr)
+        return 2
+    if args.replay:
+        install_replay(get_http_session(), args.replay)
+    elif args.record:
+        install_recorder(get_http_session(), args.record)
+    result = run_scan(args.api_key, args.pages) if args.no_history else run_recorded_scan(args.api_key, args.pages)
+    # JSON embeds the errors; the other formats report them on stderr
+    if args.format != "json" or not result.ok:
+        for error in result.errors:
+            print(f"[{error.level}] {error.source}: {error.message}", file=sys.stderr)
+    if not result.ok:
+        return 1
+    write_scan_result(result, args.format, args.output, args.window)
+    return 0
+
+
+def cmd_history(args):
+    history = get_history_store()
+    if history is None:
+        print("History is disabled (HISTORY_DIR is empty).", file=sys.stderr)
+        return 2
+    rows = history.read(start=args.start, end=args.end, symbols=args.symbol or None, pages=args.pages)
+    print(f"{len(rows)} rows from {rows['fetched_at_utc'].nunique() if len(rows) else 0} snapshots.", file=sys.stderr)
+    if args.format == "csv":
+        rows.to_csv(sys.stdout if args.output == "-" else args.output, index=False)
+    else:
+        if args.output == "-":
+            raise SystemExit("Parquet output needs --output PATH.")
+        rows.to_parquet(args.output, index=False)
+    return 0
+
+
+def cmd_mocks(args):
+    from .mocks import MockUpstreamServer
+
+    server = MockUpstreamServer(port=args.port, coins=args.coins, fixtures_dir=args.fixtures,
+                                latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                rate_429=args.rate_429, error_rate=args.error_rate, seed=args.seed)
+    source = f"fixtures in {args.fixtures}" if args.fixtures else f"{args.coins} synthetic coins"
+    print(f"Mock upstreams on {server.url} ({source}). Point the scanner at them with:", file=sys.stderr)
+    print(f"  COINGECKO_API_URL={server.url} BINANCE_API_URL={server.url} BRAVE_API_URL={server.url}",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_bench(args):
+    from . import bench
+
+    if args.load:
+        results = bench.load_results(args.load)
+    else:
+        results = bench.run_benchmark(sizes=args.sizes, runs=args.runs, warmup=args.warmup,
+                                      latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed,
+                                      rate_limits=not args.no_rate_limits)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    elif not args.baseline:
+        sys.stdout.write(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        lines, regressed = bench.compare(bench.load_results(args.baseline), results, args.threshold)
+        print("\n".join(lines))
+        return 1 if regressed else 0
+    return 0
+
+
+def cmd_startup(args):
+    from . import startup
+
+    results = startup.load_results(args.load) if args.load else startup.run_startup_profile(runs=args.runs)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    elif not args.baseline:
+        sys.stdout.write(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        lines, regressed = startup.compare(startup.load_results(args.baseline), results, args.threshold)
+        print("\n".join(lines))
+        return 1 if regressed else 0
+    return 0
+
+
+def int_list(value):
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m scanner", description="Crypto Coin Scanner (headless).")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    scan = subcommands.add_parser("scan", help="Run one scan and write the top gainers table.")
+    scan.add_argument("--pages", type=int, default=DEFAULT_SCAN_PAGES, choices=range(1, COINGECKO_MAX_PAGES + 1),
+                      metavar=f"1-{COINGECKO_MAX_PAGES}", help="CoinGecko pages of 250 coins to scan")
+    scan.add_argument("--window", choices=[*RANKING_WINDOWS, "combined"], default=DEFAULT_WINDOW,
+                      help="Price change window to rank by, or the combined ranking of all windows")
+    scan.add_argument("--format", choices=["json", "csv", "parquet"], default="json")
+    scan.add_argument("--output", default="-", help='Output file ("-" for stdout)')
+    scan.add_argument("--api-key", default=COINGECKO_API_KEY, help="CoinGecko API key (default: COINGECKO_API_KEY)")
+    recording = scan.add_mutually_exclusive_group()
+    recording.add_argument("--record", metavar="DIR", help="Save every upstream response as a fixture in DIR")
+    recording.add_argument("--replay", metavar="DIR", help="Answer upstream requests from the fixtures in DIR")
+    scan.add_argument("--no-history", action="store_true", help="Do not append the scanned universe to the history")
+    scan.set_defaults(handler=cmd_scan)
+
+    history = subcommands.add_parser("history", help="Export stored snapshots by time range.")
+    history.add_argument("--start", type=datetime.fromisoformat, help="First fetch time, UTC (e.g. 2026-10-01 or 2026-10-01T12:00)")
+    history.add_argument("--end", type=datetime.fromisoformat, help="Exclusive end fetch time, UTC")
+    history.add_argument("--symbol", action="append", help="Only this symbol (repeatable)")
+    history.add_argument("--pages", type=int, help="Only scans of this depth")
+    history.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    history.add_argument("--output", default="-", help='Output file ("-" for stdout)')
+    history.set_defaults(handler=cmd_history)
+
+    mocks = subcommands.add_parser("mocks", help="Serve mock CoinGecko, Binance and Brave APIs on one local port.")
+    mocks.add_argument("--port", type=int, default=8780)
+    mocks.add_argument("--coins", type=int, default=2000, help="Size of the synthetic market")
+    mocks.add_argument("--fixtures", metavar="DIR", help="Serve recorded fixtures instead of synthetic data")
+    mocks.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    mocks.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- variation of the latency")
+    mocks.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    mocks.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    mocks.add_argument("--seed", type=int, default=42)
+    mocks.set_defaults(handler=cmd_mocks)
+
+    bench = subcommands.add_parser("bench", help="Measure per-stage scan latency (p50/p95/p99) against mock upstreams.")
+    bench.add_argument("--sizes", type=int_list, default=[200, 2000, 15000], help="Comma-separated universe sizes")
+    bench.add_argument("--runs", type=int, default=20, help="Measured runs per size")
+    bench.add_argument("--warmup", type=int, default=2, help="Unmeasured runs per size")
+    bench.add_argument("--latency-ms", type=float, default=0.0, help="Mock latency per request")
+    bench.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- variation of the latency")
+    bench.add_argument("--seed", type=int, default=42)
+    bench.add_argument("--no-rate-limits", action="store_true",
+                       help="Unbudget the upstream rate limiters to measure the pipeline alone")
+    bench.add_argument("--output", metavar="PATH", help="Save the results as JSON (default: stdout)")
+    bench.add_argument("--baseline", metavar="PATH", help="Compare against earlier results; exit 1 on regression")
+    bench.add_argument("--threshold", type=float, default=0.10, help="Allowed total p50 slowdown (default: 0.10)")
+    bench.add_argument("--load", metavar="PATH", help="Compare saved results instead of running the benchmark")
+    bench.set_defaults(handler=cmd_bench)
+
+    startup = subcommands.add_parser("startup", help="Profile app.py cold start: import times and time to first render.")
+    startup.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement (medians are reported)")
+    startup.add_argument("--output", metavar="PATH", help="Save the results as JSON (default: stdout)")
+    startup.add_argument("--baseline", metavar="PATH", help="Compare against earlier results; exit 1 on regression")
+    startup.add_argument("--threshold", type=float, default=0.10, help="Allowed first run slowdown (default: 0.10)")
+    startup.add_argument("--load", metavar="PATH", help="Compare saved results instead of profiling")
+    startup.set_defaults(handler=cmd_startup)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
@@ -0,0 +1,179 @@
+"""CoinGecko /coins/markets pagination, the columnar market frame and gainer ranking."""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+
+from .config import (
+    COINGECKO_MAX_PAGES, COINGECKO_MAX_WORKERS, COINGECKO_PER_PAGE, MIN_TOTAL_VOLUME_USD, PRICE_CHANGE_WINDOWS,
+    RANKING_WINDOWS, TOP_N_GAINERS,
+)
+from .http_client import http_get
+from .models import ScanError
+from .timing import stage
+
+COINGECKO_MARKETS_PATH = "/api/v3/coins/markets"
+MARKET_COLUMNS = ["id", "name", "symbol", "current_price", "total_volume"]
+
+
+def change_column(window):
+    """
+    Market frame column holding the price change over `window`: the /coins/markets field
+    for CoinGecko windows (e.g. "24h"), added by the engine for Binance rolling windows.
+    """
+    return f"price_change_percentage_{window}_in_currency"
+
+
+# The only /coins/markets fields the scanner reads, out of ~30 per coin
+CoinRecord = namedtuple("CoinRecord", [*MARKET_COLUMNS, *(change_column(window) for window in PRICE_CHANGE_WINDOWS)])
+
+
+def coin_record(obj):
+    """
+    json object_hook projecting each coin onto a CoinRecord as it is decoded, so the full
+    dicts of a page are never held together. Nested objects (e.g. "roi") pass through and
+    are dropped with their coin's dict.
+    """
+    if "id" not in obj:
+        return obj
+    return CoinRecord._make(obj.get(name) for name in CoinRecord._fields)
+
+
+def fetch_coingecko_page(page_num, headers):
+    """
+    Fetches a single /coins/markets page.
+    Runs inside worker threads, so errors are returned to the caller instead of raised.
+    """
+    params = {
+        "vs_currency": "usd",
+        "order": "market_cap_desc",
+        "per_page": COINGECKO_PER_PAGE,
+        "page": page_num,
+        "sparkline": "false",
+        "price_change_percentage": ",".join(PRICE_CHANGE_WINDOWS) # Every window in the same call
+    }
+    try:
+        response = http_get("coingecko", COINGECKO_MARKETS_PATH, headers=headers, params=params)
+        response.raise_for_status()  # Raises an exception for 4XX/5XX errors
+        return response.json(object_hook=coin_record) or [], None
+    except Exception as e: # Reported by get_market_frame
+        return None, e
+
+
+def get_market_frame(key, pages, errors):
+    """
+    Fetches `pages` /coins/markets pages concurrently and returns them as a market frame
+    (see build_market_frame), ready to be ranked for any window without another call.
+    Problems are appended to `errors` as ScanError; returns None when there is nothing to show.
+    """
+    if not key:
+        errors.append(ScanError("coingecko", "warning", "Por favor, insira a API Key para buscar os dados."))
+        return None
+
+    pages = max(1, min(int(pages), COINGECKO_MAX_PAGES))
+    headers = {"x-cg-demo-api-key": key}
+
+    with stage("coingecko_fetch"), ThreadPoolExecutor(max_workers=min(pages, COINGECKO_MAX_WORKERS)) as executor:
+        futures = [executor.submit(fetch_coingecko_page, page_num, headers) for page_num in range(1, pages + 1)]
+
+        # Results are consumed in page order so deduplication and error reporting
+        # behave exactly as with the old serial loop.
+        all_coins_data = [] # CoinRecords, projected while each page was decoded
+        had_errors = False
+        for page_num, future in enumerate(futures, start=1):
+            page_data, error = future.result()
+            if error is None:
+                all_coins_data.extend(page_data)
+                continue
+
+            had_errors = True
+            if isinstance(error, requests.exceptions.HTTPError):
+                status_code = error.response.status_code
+                if status_code == 401:
+                    errors.append(ScanError(
+                        "coingecko", "error",
+                        "API Key inválida ou não autorizada. Verifique sua chave e tente novamente.", status_code
+                    ))
+                    for pending in futures[page_num:]:
+                        pending.cancel()
+                    return None # Critical error, stop
+                elif status_code == 429:
+                    message = f"Limite de requisições da API atingido (tentativa na página {page_num})."
+                else: # Other HTTP errors
+                    message = f"Erro HTTP {status_code} ao buscar dados da página {page_num}."
+                errors.append(ScanError("coingecko", "error", message, status_code))
+            elif isinstance(error, requests.exceptions.RequestException): # Covers connection errors, timeouts, etc.
+                errors.append(ScanError("coingecko", "error", f"Erro de conexão ao buscar dados da página {page_num}: {error}"))
+            else: # Catch other potential errors like JSONDecodeError
+                errors.append(ScanError("coingecko", "error", f"Ocorreu um erro inesperado ao processar dados da página {page_num}: {error}"))
+            # Keep going: pages that did succeed are still used as partial data
+
+    if not all_coins_data:
+        if not had_errors:
+            errors.append(ScanError(
+                "coingecko", "warning",
+                "Nenhuma moeda foi encontrada após as tentativas de busca. Verifique a API Key e a conexão."
+            ))
+        return None
+
+    with stage("rank"):
+        market_df = build_market_frame(all_coins_data)
+    if market_df.empty:
+        errors.append(ScanError(
+            "coingecko", "info",
+            "Nenhuma moeda atendeu aos critérios de volume e variação de preço após o processamento dos dados coletados."
+        ))
+        return None
+
+    return market_df
+
+
+def build_market_frame(coins):
+    """
+    Columnar view of the /coins/markets rows (CoinRecords): one row per coin id (last seen
+    instance prevails), float64 price/volume and one change column per window, restricted
+    to coins with enough volume and a change in at least one window.
+    """
+    change_columns = [change_column(window) for window in PRICE_CHANGE_WINDOWS]
+    frame = pd.DataFrame.from_records(coins, columns=CoinRecord._fields)
+    numeric_columns = ["current_price", "total_volume", *change_columns]
+    frame[numeric_columns] = frame[numeric_columns].apply(pd.to_numeric, errors='coerce').astype('float64')
+
+    # Deduplicate coins using 'id' as a unique identifier, last seen instance prevails
+    frame = frame.drop_duplicates(subset='id', keep='last')
+    mask = (frame['total_volume'] > MIN_TOTAL_VOLUME_USD) & frame[change_columns].notna().any(axis=1)
+    frame = frame.loc[mask].reset_index(drop=True)
+    frame['name'] = frame['name'].fillna('N/A')
+    frame['symbol'] = frame['symbol'].fillna('N/A').str.upper()
+    return frame
+
+
+def rank_window(market_df, window, top_n=TOP_N_GAINERS):
+    """
+    The `top_n` rows of market_df by change over `window`, best first. nlargest does a
+    partial selection, so large universes are never fully sorted.
+    """
+    column = change_column(window)
+    return market_df.nlargest(top_n, column).dropna(subset=[column]) # nlargest pads with NaN rows past the last value
+
+
+def rank_all_windows(market_df, top_n=TOP_N_GAINERS):
+    """
+    Combined ranking over every window: each coin's position in each window's ranking
+    as a percentage of the coins ranked there (near 0 = biggest gain), their mean over
+    the windows where the coin has data, and in how many windows it makes the top `top_n`.
+    Percentages make positions comparable between the whole CoinGecko universe and the
+    few hundred Binance-listed coins of the rolling windows. Coins need data in at least
+    half the windows, so coins without a Binance pair still compete on the CoinGecko ones.
+    Returns the `top_n` coins by mean position, best first.
+    """
+    change_columns = [change_column(window) for window in RANKING_WINDOWS]
+    positions = market_df[change_columns].rank(ascending=False, method='min')
+    relative_positions = market_df[change_columns].rank(ascending=False, method='min', pct=True) * 100
+    covered = positions.notna().sum(axis=1) >= (len(change_columns) + 1) // 2
+    combined = market_df.assign(
+        mean_position=relative_positions.mean(axis=1), # Skips windows without data
+        top_windows=(positions <= top_n).sum(axis=1),
+    )
+    return combined.loc[covered].nsmallest(top_n, 'mean_position')
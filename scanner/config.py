@@ -0,0 +1,90 @@
+"""Process-wide settings, read once from the environment (and .env) at import time."""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv() # Carrega variáveis do arquivo .env
+
+# Local directory for process-wide caches that should survive a restart
+CACHE_DIR = os.getenv(
+    "SCANNER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+)
+
+# --- HTTP ---
+# Base URLs can be pointed at local mocks (python -m scanner mocks) for offline runs
+UPSTREAMS = {
+    "coingecko": {"base_url": os.getenv("COINGECKO_API_URL", "https://api.coingecko.com"), "timeout": (3.05, 10)},
+    "binance": {"base_url": os.getenv("BINANCE_API_URL", "https://api.binance.com"), "timeout": (3.05, 5)},
+    "brave": {"base_url": os.getenv("BRAVE_API_URL", "https://api.search.brave.com"), "timeout": (3.05, 10)},
+}
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16")) # Connections kept open per host
+# Record every upstream response into fixture files, or serve responses from them without network
+SCANNER_RECORD_DIR = os.getenv("SCANNER_RECORD_DIR", "")
+SCANNER_REPLAY_DIR = os.getenv("SCANNER_REPLAY_DIR", "")
+# 429 and 5xx responses are retried with backoff until this many seconds after the first attempt
+HTTP_RETRY_DEADLINE_SECONDS = float(os.getenv("HTTP_RETRY_DEADLINE_SECONDS", "20"))
+
+# --- CoinGecko ---
+COINGECKO_API_KEY = os.getenv("COINGECKO_API_KEY", "") # Used by headless callers (refresher, CLI)
+COINGECKO_PER_PAGE = 250 # Maximum page size accepted by /coins/markets
+COINGECKO_MAX_PAGES = 60
+DEFAULT_SCAN_PAGES = max(1, min(int(os.getenv("COINGECKO_PAGES", "2")), COINGECKO_MAX_PAGES))
+COINGECKO_MAX_WORKERS = int(os.getenv("COINGECKO_MAX_WORKERS", "8")) # Bounded pool for concurrent page fetches
+MIN_TOTAL_VOLUME_USD = 1_000_000
+# Price change windows requested in the same /coins/markets call; rankings for each are computed locally
+PRICE_CHANGE_WINDOWS = ("1h", "24h", "7d", "14d", "30d", "1y")
+DEFAULT_WINDOW = "24h"
+COINGECKO_CALLS_PER_MINUTE = float(os.getenv("COINGECKO_CALLS_PER_MINUTE", "30")) # Demo plan budget; 0 disables pacing
+TOP_N_GAINERS = 10
+
+# --- Binance ---
+BINANCE_PAIRS_TTL_SECONDS = float(os.getenv("BINANCE_PAIRS_TTL_SECONDS", str(6 * 3600)))
+BINANCE_TICKER_BATCH_LIMIT = 100 # Above this, the unfiltered /ticker/24hr call is cheaper in request weight
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443/ws/!miniTicker@arr")
+BINANCE_WEIGHT_LIMIT_1M = int(os.getenv("BINANCE_WEIGHT_LIMIT_1M", "6000")) # Request weight allowed per IP and minute
+BINANCE_STREAM_GAP_SECONDS = float(os.getenv("BINANCE_STREAM_GAP_SECONDS", "5")) # The stream pushes every ~1s
+# Rolling-window ticker sizes (/api/v3/ticker windowSize) ranked alongside CoinGecko's windows; empty disables them
+BINANCE_ROLLING_WINDOWS = tuple(
+    f"{size.strip()}-binance" for size in os.getenv("BINANCE_ROLLING_WINDOWS", "15m,1h,4h,12h").split(",") if size.strip()
+)
+BINANCE_ROLLING_BATCH_LIMIT = 100 # Most symbols /api/v3/ticker accepts per request
+# Each rolling window's changes are reused for 1/N of its length (15m: 1 min, 12h: 48 min), saving request weight
+BINANCE_ROLLING_TTL_DIVISOR = float(os.getenv("BINANCE_ROLLING_TTL_DIVISOR", "15"))
+# Share of the minute's remaining Binance weight one scan may spend on rolling tickers; the rest waits for later scans
+BINANCE_ROLLING_WEIGHT_SHARE = float(os.getenv("BINANCE_ROLLING_WEIGHT_SHARE", "0.5"))
+BINANCE_MAX_WORKERS = int(os.getenv("BINANCE_MAX_WORKERS", "8")) # Bounded pool for concurrent rolling ticker batches
+
+# --- Ranking ---
+# Every window a ranking can be built for: CoinGecko's, then Binance's rolling windows
+RANKING_WINDOWS = PRICE_CHANGE_WINDOWS + BINANCE_ROLLING_WINDOWS
+
+# --- Brave Search ---
+BRAVE_RATE_LIMIT_RPS = float(os.getenv("BRAVE_RATE_LIMIT_RPS", "1")) # Free plan: 1 request per second
+BRAVE_NEWS_FRESHNESS = "pd" # Past day results
+# How long a cached Brave result is served, per freshness window: a small fraction of
+# the window, so "past day" results never drift far from what Brave would return now.
+NEWS_TTL_BY_FRESHNESS = {"pd": 3600, "pw": 6 * 3600, "pm": 24 * 3600, "py": 7 * 24 * 3600}
+NEWS_CACHE_MAX_ENTRIES = int(os.getenv("NEWS_CACHE_MAX_ENTRIES", "2000"))
+
+# --- Snapshots ---
+SNAPSHOT_TTL_SECONDS = float(os.getenv("SNAPSHOT_TTL_SECONDS", "60"))
+# How long "Buscar Dados" waits for a refresh when older data can be shown meanwhile
+SNAPSHOT_REVALIDATE_WAIT_SECONDS = float(os.getenv("SNAPSHOT_REVALIDATE_WAIT_SECONDS", "5"))
+# Latest snapshot per scan depth, saved after every scan and loaded at startup; set SNAPSHOT_DIR="" to disable
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(CACHE_DIR, "snapshots"))
+# How often live mode checks the shared snapshot for newer data
+LIVE_REFRESH_SECONDS = float(os.getenv("LIVE_REFRESH_SECONDS", "10"))
+BACKGROUND_REFRESH_SECONDS = float(os.getenv("BACKGROUND_REFRESH_SECONDS", "0")) # 0 disables the refresher
+
+# --- History ---
+# Daily Parquet partitions of every scanned universe; set HISTORY_DIR="" to disable
+HISTORY_DIR = os.getenv("HISTORY_DIR", os.path.join(CACHE_DIR, "history"))
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "30")) # 0 keeps every day
+# Snapshots are buffered and written together once either limit is reached (and at exit)
+HISTORY_FLUSH_ROWS = int(os.getenv("HISTORY_FLUSH_ROWS", "50000"))
+HISTORY_FLUSH_SECONDS = float(os.getenv("HISTORY_FLUSH_SECONDS", "300"))
+
+# --- Metrics ---
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) # Prometheus /metrics endpoint; 0 disables it
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
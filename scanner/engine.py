@@ -0,0 +1,283 @@
+"""
+Headless scan engine: CoinGecko gainers enriched with Binance data, as a ScanResult.
+
+Nothing here touches Streamlit, so the same pipeline runs in the app, from cron through
+the CLI, and inside benchmarks. Problems are collected as ScanError values instead of
+being displayed.
+"""
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from .binance import (
+    check_binance_data, get_binance_rolling_changes, get_binance_ticker_index, get_binance_tradable_usdt_pairs,
+    rolling_window_size,
+)
+from .cache import get_snapshot_cache, snapshot_cache_key, snapshot_path
+from .coingecko import change_column, get_market_frame, rank_all_windows, rank_window
+from .config import (
+    BINANCE_ROLLING_WINDOWS, DEFAULT_WINDOW, RANKING_WINDOWS, SNAPSHOT_TTL_SECONDS, TOP_N_GAINERS,
+)
+from .history import get_history_store
+from .models import MarketSnapshot, ScanResult
+from .stream import get_binance_ticker_stream
+from .timing import stage
+
+BINANCE_COLUMNS = ["Status Binance", "Preço Binance (USD)", "Volume Binance (24h)"]
+
+
+def window_label(window):
+    """Display name of a window: CoinGecko's as-is ("24h"), Binance rolling ones marked ("15m Binance")."""
+    return f"{rolling_window_size(window)} Binance" if window in BINANCE_ROLLING_WINDOWS else window
+
+
+def gain_column(window):
+    """Results table column holding the change over `window`."""
+    return f"% Subida ({window_label(window)})"
+
+
+def coins_numeric_columns(window=DEFAULT_WINDOW):
+    return ["Preço CoinGecko (USD)", gain_column(window), "Preço Binance (USD)", "Volume Binance (24h)"]
+
+
+COINS_NUMERIC_COLUMNS = coins_numeric_columns()
+
+
+def build_coins_df(rows, window=DEFAULT_WINDOW):
+    """Builds the results table with typed columns: float64 numbers (NaN when unavailable) and a categorical status."""
+    numeric_columns = coins_numeric_columns(window)
+    coins_df = pd.DataFrame(rows, columns=["Nome", "Símbolo", *numeric_columns[:2], "Status Binance", *numeric_columns[2:]])
+    coins_df[numeric_columns] = coins_df[numeric_columns].apply(pd.to_numeric, errors='coerce').astype('float64')
+    coins_df["Status Binance"] = coins_df["Status Binance"].astype('category')
+    return coins_df
+
+
+def build_binance_df(rows):
+    """Binance columns per symbol (rows are {"Símbolo", *BINANCE_COLUMNS} dicts), typed like build_coins_df."""
+    binance_df = pd.DataFrame(rows, columns=["Símbolo", *BINANCE_COLUMNS]).drop_duplicates("Símbolo").set_index("Símbolo")
+    binance_df[BINANCE_COLUMNS[1:]] = binance_df[BINANCE_COLUMNS[1:]].apply(pd.to_numeric, errors='coerce').astype('float64')
+    return binance_df
+
+
+def _with_binance_columns(table, binance_df):
+    """Appends the Binance columns to a table with a "Símbolo" column (symbols never checked are marked unavailable)."""
+    binance = binance_df.reindex(table["Símbolo"])
+    table["Status Binance"] = pd.Categorical(binance["Status Binance"].fillna("❌ Verif. Indisponível").to_numpy())
+    for column in BINANCE_COLUMNS[1:]:
+        table[column] = binance[column].to_numpy()
+    return table
+
+
+def window_gainers_df(snapshot, window=DEFAULT_WINDOW, top_n=TOP_N_GAINERS):
+    """The top gainers table for `window`, ranked locally from the snapshot's market frame (no API call)."""
+    return _window_table(snapshot.market_df, snapshot.binance_df, window, top_n)
+
+
+def _window_table(market_df, binance_df, window, top_n=TOP_N_GAINERS):
+    ranked = rank_window(market_df, window, top_n)
+    table = pd.DataFrame({
+        "Nome": ranked["name"].to_numpy(),
+        "Símbolo": ranked["symbol"].to_numpy(),
+        "Preço CoinGecko (USD)": ranked["current_price"].to_numpy(),
+        gain_column(window): ranked[change_column(window)].to_numpy(),
+    })
+    return _with_binance_columns(table, binance_df)
+
+
+def multi_window_df(snapshot, top_n=TOP_N_GAINERS):
+    """Combined ranking across every window (mean position, windows in the top), from the snapshot alone."""
+    ranked = rank_all_windows(snapshot.market_df, top_n)
+    table = pd.DataFrame({
+        "Nome": ranked["name"].to_numpy(),
+        "Símbolo": ranked["symbol"].to_numpy(),
+        "Preço CoinGecko (USD)": ranked["current_price"].to_numpy(),
+        "Posição média (%)": ranked["mean_position"].to_numpy(),
+        f"Janelas no Top {top_n}": ranked["top_windows"].to_numpy(),
+        **{gain_column(window): ranked[change_column(window)].to_numpy() for window in RANKING_WINDOWS},
+    })
+    return _with_binance_columns(table, snapshot.binance_df)
+
+
+def rank_changes(table, previous_table):
+    """
+    Movement of each row of `table` since `previous_table` (the same ranking from an older
+    snapshot), matched by symbol: "▲ n" moved up n places, "▼ n" down, "=" unchanged, "🆕" new.
+    """
+    previous_positions = {}
+    for position, symbol in enumerate(previous_table["Símbolo"]):
+        previous_positions.setdefault(symbol, position)
+    labels = []
+    for position, symbol in enumerate(table["Símbolo"]):
+        before = previous_positions.get(symbol)
+        if before is None:
+            labels.append("🆕")
+        elif before > position:
+            labels.append(f"▲ {before - position}")
+        elif before < position:
+            labels.append(f"▼ {position - before}")
+        else:
+            labels.append("=")
+    return labels
+
+
+def add_rolling_changes(market_df, tradable_usdt_pairs, errors):
+    """
+    Adds one change column per Binance rolling window to market_df, for coins with a
+    tradable USDT pair (NaN elsewhere, or when Binance is unavailable). Only the pairs of
+    coins in the frame are requested, which is all that any ranking can use.
+    """
+    pairs = market_df["symbol"] + "USDT"
+    binance_symbols = pairs[pairs.isin(tradable_usdt_pairs or ())].unique().tolist()
+    changes = get_binance_rolling_changes(binance_symbols, BINANCE_ROLLING_WINDOWS, errors)
+    return market_df.assign(**{
+        change_column(window): pairs.map(changes[window]).astype('float64') for window in BINANCE_ROLLING_WINDOWS
+    })
+
+
+def run_scan(key, pages):
+    """
+    Runs the full CoinGecko + Binance pipeline once and returns a ScanResult. Binance is
+    checked for every coin that can appear in any window's ranking or the combined one,
+    so switching windows later needs no API call.
+    """
+    errors = []
+    market_df = get_market_frame(key, pages, errors)
+    if market_df is None:
+        return ScanResult(None, tuple(errors))
+    fetched_at_utc = datetime.utcnow()
+    with stage("binance_pairs"):
+        tradable_usdt_pairs = get_binance_tradable_usdt_pairs(errors)
+
+    if BINANCE_ROLLING_WINDOWS:
+        with stage("binance_rolling"):
+            market_df = add_rolling_changes(market_df, tradable_usdt_pairs, errors)
+
+    with stage("rank"):
+        candidates = pd.concat([rank_window(market_df, window) for window in RANKING_WINDOWS] + [rank_all_windows(market_df)])
+        candidate_symbols = candidates["symbol"].drop_duplicates().tolist()
+
+    with stage("binance_enrich"):
+        binance_stream = get_binance_ticker_stream()
+        if binance_stream.is_fresh(): # Streaming mode: the live table is already up to date, no REST call
+            ticker_index = binance_stream.table
+        else:
+            ticker_index = get_binance_ticker_index(
+                [f"{symbol}USDT" for symbol in candidate_symbols if f"{symbol}USDT" in (tradable_usdt_pairs or ())], errors
+            )
+
+        binance_rows = []
+        for symbol in candidate_symbols:
+            binance_data = check_binance_data(symbol, tradable_usdt_pairs, ticker_index, errors)
+            binance_rows.append({
+                "Símbolo": symbol,
+                "Status Binance": binance_data['status_binance'],
+                "Preço Binance (USD)": binance_data['price_binance'],
+                "Volume Binance (24h)": binance_data['volume_binance'],
+            })
+
+    with stage("dataframe"):
+        binance_df = build_binance_df(binance_rows)
+        snapshot = MarketSnapshot(
+            market_df=market_df,
+            binance_df=binance_df,
+            coins_df=_window_table(market_df, binance_df, DEFAULT_WINDOW),
+            fetched_at_utc=fetched_at_utc,
+        )
+    return ScanResult(snapshot, tuple(errors))
+
+
+def save_snapshot(snapshot, pages):
+    """
+    Saves a snapshot as one Parquet file: the market frame with each symbol's Binance
+    columns alongside and the fetch time. Written to a temp file and renamed, so a
+    reader never loads half a snapshot. Best effort, like the other on-disk caches.
+    """
+    path = snapshot_path(pages)
+    if path is None:
+        return
+    binance = snapshot.binance_df.reindex(snapshot.market_df["symbol"])
+    frame = snapshot.market_df.assign(
+        binance_status=binance["Status Binance"].astype(object).to_numpy(),
+        binance_price=binance["Preço Binance (USD)"].to_numpy(),
+        binance_volume=binance["Volume Binance (24h)"].to_numpy(),
+        fetched_at_utc=pd.Timestamp(snapshot.fetched_at_utc),
+    )
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass # The in-memory snapshot is still valid
+
+
+def load_snapshot(pages):
+    """The snapshot saved by save_snapshot for this scan depth, marked as restored, or None."""
+    path = snapshot_path(pages)
+    if path is None:
+        return None
+    try:
+        frame = pd.read_parquet(path)
+        fetched_at_utc = frame["fetched_at_utc"].iloc[0].to_pydatetime()
+    except (OSError, ValueError, KeyError, IndexError):
+        return None # No usable file: the first scan fetches as before
+
+    checked = frame.loc[frame["binance_status"].notna()]
+    binance_df = build_binance_df([
+        {"Símbolo": symbol, "Status Binance": status, "Preço Binance (USD)": price, "Volume Binance (24h)": volume}
+        for symbol, status, price, volume in zip(
+            checked["symbol"], checked["binance_status"], checked["binance_price"], checked["binance_volume"]
+        )
+    ])
+    market_df = frame.drop(columns=["binance_status", "binance_price", "binance_volume", "fetched_at_utc"])
+    for window in RANKING_WINDOWS: # Windows added since the file was saved rank as missing
+        if change_column(window) not in market_df:
+            market_df[change_column(window)] = float("nan")
+    return MarketSnapshot(
+        market_df=market_df,
+        binance_df=binance_df,
+        coins_df=_window_table(market_df, binance_df, DEFAULT_WINDOW),
+        fetched_at_utc=fetched_at_utc,
+        restored=True,
+    )
+
+
+def run_recorded_scan(key, pages):
+    """
+    run_scan, appending a successful snapshot's universe to the history store (when
+    enabled) and saving it for the next process to warm-start from.
+    """
+    result = run_scan(key, pages)
+    if result.ok:
+        history = get_history_store()
+        if history is not None:
+            history.append(result.snapshot, pages)
+        save_snapshot(result.snapshot, pages)
+    return result
+
+
+def warm_start_shared_scan(pages):
+    """
+    Seeds the process-wide SnapshotCache with the saved snapshot for this scan depth when it
+    has none yet, so a fresh process renders data immediately. Returns the seeded snapshot or None.
+    """
+    cache = get_snapshot_cache()
+    key = snapshot_cache_key(pages)
+    if cache.peek(key) is not None:
+        return None
+    snapshot = load_snapshot(pages)
+    if snapshot is None:
+        return None
+    age = (datetime.utcnow() - snapshot.fetched_at_utc).total_seconds()
+    return snapshot if cache.seed(key, snapshot, age) else None
+
+
+def run_shared_scan(key, pages, ttl=SNAPSHOT_TTL_SECONDS):
+    """run_recorded_scan through the process-wide SnapshotCache: fresh snapshots are reused and concurrent misses share one fetch."""
+    return get_snapshot_cache().get_or_fetch(snapshot_cache_key(pages), lambda: run_recorded_scan(key, pages), ttl=ttl)
+
+
+def revalidate_shared_scan(key, pages, ttl=SNAPSHOT_TTL_SECONDS):
+    """Stale-while-revalidate run_shared_scan: returns a Future of the ScanResult without blocking the caller."""
+    return get_snapshot_cache().revalidate(snapshot_cache_key(pages), lambda: run_recorded_scan(key, pages), ttl=ttl)
@@ -0,0 +1,179 @@
+"""
+Append-only history of scan snapshots, stored as daily Parquet partitions.
+
+Every successful scan's full market frame (the whole filtered universe, every window)
+is buffered in memory and written in batches to
+
+    HISTORY_DIR/date=YYYY-MM-DD/part-<first fetch>-<unique>.parquet
+
+Files are never rewritten while their day is current, so writers need no coordination
+and readers never see partial data. Reads prune by partition date before touching a
+file, then filter rows by fetch time. Past days are compacted into one file, and days
+older than HISTORY_RETENTION_DAYS are deleted.
+"""
+import atexit
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from .config import HISTORY_DIR, HISTORY_FLUSH_ROWS, HISTORY_FLUSH_SECONDS, HISTORY_RETENTION_DAYS
+from .util import process_singleton
+
+PARTITION_PREFIX = "date="
+
+
+def snapshot_rows(snapshot, pages):
+    """History rows of one snapshot: its market frame plus the fetch time and scan depth."""
+    return snapshot.market_df.assign(
+        fetched_at_utc=pd.Timestamp(snapshot.fetched_at_utc),
+        pages=int(pages),
+    )
+
+
+class HistoryStore:
+    """
+    Thread-safe writer and reader of the snapshot history under `root`. Appends are
+    buffered until `flush_rows` rows or `flush_seconds` have accumulated (and at exit);
+    `retention_days` of 0 keeps everything.
+    """
+
+    def __init__(self, root, retention_days=HISTORY_RETENTION_DAYS, flush_rows=HISTORY_FLUSH_ROWS,
+                 flush_seconds=HISTORY_FLUSH_SECONDS):
+        self.root = root
+        self.retention_days = retention_days
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock() # Guards the buffer
+        self._write_lock = threading.Lock() # Serializes file writes, compaction and retention
+        self._buffer = []
+        self._buffered_rows = 0
+        self._buffer_started = None # Monotonic time of the oldest buffered append
+
+    def append(self, snapshot, pages):
+        """Buffers a snapshot's rows, flushing when the batch is full or old enough."""
+        rows = snapshot_rows(snapshot, pages)
+        with self._lock:
+            self._buffer.append(rows)
+            self._buffered_rows += len(rows)
+            if self._buffer_started is None:
+                self._buffer_started = time.monotonic()
+            due = (self._buffered_rows >= self.flush_rows
+                   or time.monotonic() - self._buffer_started >= self.flush_seconds)
+        if due:
+            self.flush()
+
+    def _take_buffer(self):
+        with self._lock:
+            frames, self._buffer = self._buffer, []
+            self._buffered_rows, self._buffer_started = 0, None
+        return frames
+
+    def flush(self):
+        """Writes everything buffered as one new file per day, then applies compaction and retention."""
+        frames = self._take_buffer()
+        if not frames:
+            return
+        with self._write_lock:
+            try:
+                batch = pd.concat(frames, ignore_index=True)
+                for day, rows in batch.groupby(batch["fetched_at_utc"].dt.date):
+                    directory = os.path.join(self.root, f"{PARTITION_PREFIX}{day.isoformat()}")
+                    os.makedirs(directory, exist_ok=True)
+                    name = f"part-{rows['fetched_at_utc'].min():%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+                    tmp_path = os.path.join(directory, f".{name}.tmp")
+                    rows.to_parquet(tmp_path, index=False)
+                    os.replace(tmp_path, os.path.join(directory, name)) # Readers only ever list complete files
+                self._maintain()
+            except Exception as e: # History is best effort; scans must not fail because the disk or Parquet writer did
+                print(f"History not written to {self.root}: {e}", file=sys.stderr)
+
+    def partitions(self):
+        """{day: partition directory} of every stored day."""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return {}
+        days = {}
+        for name in names:
+            if name.startswith(PARTITION_PREFIX):
+                try:
+                    days[datetime.strptime(name[len(PARTITION_PREFIX):], "%Y-%m-%d").date()] = os.path.join(self.root, name)
+                except ValueError:
+                    continue
+        return days
+
+    @staticmethod
+    def _files(directory):
+        return sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.endswith(".parquet") and not name.startswith(".")
+        )
+
+    def _maintain(self):
+        """Drops days past retention and merges each finished day into a single file. Caller holds the write lock."""
+        today = datetime.utcnow().date()
+        for day, directory in self.partitions().items():
+            if self.retention_days and day < today - timedelta(days=self.retention_days):
+                shutil.rmtree(directory, ignore_errors=True)
+            elif day < today:
+                files = self._files(directory)
+                if len(files) > 1:
+                    merged = pd.concat([pd.read_parquet(path) for path in files], ignore_index=True)
+                    tmp_path = os.path.join(directory, ".part-compacted.parquet.tmp")
+                    merged.sort_values("fetched_at_utc", kind="stable").to_parquet(tmp_path, index=False)
+                    os.replace(tmp_path, os.path.join(directory, "part-000000-compacted.parquet"))
+                    for path in files:
+                        if not path.endswith("part-000000-compacted.parquet"):
+                            os.remove(path)
+
+    def read(self, start=None, end=None, columns=None, symbols=None, pages=None):
+        """
+        Stored rows with start <= fetched_at_utc < end (naive UTC datetimes; None is open),
+        optionally restricted to `columns`, `symbols` and one scan depth, oldest first.
+        Buffered rows not yet written are included.
+        """
+        read_columns = columns and list(dict.fromkeys([*columns, "fetched_at_utc", "symbol", "pages"]))
+        filters = [] # Pushed down to Parquet row groups; rows are filtered again below for the buffer
+        if start is not None:
+            filters.append(("fetched_at_utc", ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append(("fetched_at_utc", "<", pd.Timestamp(end)))
+        files = []
+        with self._write_lock: # Not while compaction swaps files
+            for day, directory in sorted(self.partitions().items()):
+                if (start is None or day >= start.date()) and (end is None or day <= end.date()):
+                    files.extend(self._files(directory))
+            frames = [pd.read_parquet(path, columns=read_columns, filters=filters or None) for path in files]
+        with self._lock:
+            frames.extend(self._buffer)
+        if not frames:
+            return pd.DataFrame(columns=columns or [])
+
+        history = pd.concat(frames, ignore_index=True)
+        mask = pd.Series(True, index=history.index)
+        if start is not None:
+            mask &= history["fetched_at_utc"] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= history["fetched_at_utc"] < pd.Timestamp(end)
+        if symbols is not None:
+            mask &= history["symbol"].isin([symbol.upper() for symbol in symbols])
+        if pages is not None:
+            mask &= history["pages"] == int(pages)
+        history = history.loc[mask].sort_values("fetched_at_utc", kind="stable").reset_index(drop=True)
+        return history[columns] if columns else history
+
+
+@process_singleton
+def get_history_store():
+    """The process-wide HistoryStore, or None when HISTORY_DIR is set to an empty value. Flushed at exit."""
+    if not HISTORY_DIR:
+        return None
+    store = HistoryStore(HISTORY_DIR)
+    atexit.register(store.flush)
+    return store
@@ -0,0 +1,70 @@
+"""
+Shared HTTP client layer.
+
+One process-wide requests.Session is used by every upstream helper: each upstream host
+gets its own keep-alive connection pool, so repeated scans reuse open TCP+TLS
+connections instead of paying a new handshake per call. Every call goes through the
+upstream's adaptive rate limiter and is retried on 429/5xx within a deadline.
+"""
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import HTTP_POOL_MAXSIZE, HTTP_RETRY_DEADLINE_SECONDS, SCANNER_RECORD_DIR, SCANNER_REPLAY_DIR, UPSTREAMS
+from .metrics import HTTP_RETRIES, RATE_LIMIT_WAIT, record_http_response
+from .ratelimit import RETRYABLE_STATUSES, backoff_delay, get_rate_limiter
+from .recording import install_recorder, install_replay
+from .util import process_singleton
+
+
+@process_singleton
+def get_http_session():
+    """Creates the shared pooled session (one per process)."""
+    session = requests.Session()
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    for upstream in UPSTREAMS.values():
+        session.mount(upstream["base_url"], HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE))
+    if SCANNER_REPLAY_DIR:
+        install_replay(session, SCANNER_REPLAY_DIR)
+    elif SCANNER_RECORD_DIR:
+        install_recorder(session, SCANNER_RECORD_DIR)
+    return session
+
+
+def http_get(upstream, path, weight=1, deadline=HTTP_RETRY_DEADLINE_SECONDS, limiter=None, **kwargs):
+    """
+    GET `path` on the given upstream through the shared session, applying its default timeout.
+    Waits for the upstream's rate limiter first (`weight` is the request weight for Binance)
+    and retries 429/5xx responses after Retry-After or a jittered backoff, as long as the
+    retry starts within `deadline` seconds. The last response is returned either way.
+    `limiter` replaces the upstream's shared limiter (e.g. the one of the caller's API key).
+    """
+    config = UPSTREAMS[upstream]
+    kwargs.setdefault("timeout", config["timeout"])
+    limiter = limiter or get_rate_limiter(upstream)
+    give_up_at = time.monotonic() + deadline
+    attempt = 0
+    while True:
+        RATE_LIMIT_WAIT.inc(limiter.acquire(weight), upstream=upstream)
+        start = time.perf_counter()
+        try:
+            response = get_http_session().get(config["base_url"] + path, **kwargs)
+        except requests.exceptions.RequestException:
+            record_http_response(upstream, "error", time.perf_counter() - start)
+            raise
+        record_http_response(upstream, response.status_code, time.perf_counter() - start)
+
+        retry_after = limiter.observe(response)
+        if response.status_code not in RETRYABLE_STATUSES:
+            return response
+        delay = backoff_delay(attempt) if retry_after is None else retry_after * random.uniform(1.0, 1.1)
+        if time.monotonic() + delay > give_up_at:
+            return response
+        HTTP_RETRIES.inc(upstream=upstream)
+        time.sleep(delay)
+        attempt += 1
@@ -0,0 +1,215 @@
+"""
+Process-wide metrics in the Prometheus text format, without extra dependencies.
+
+Counters and histograms are updated by the scan pipeline (HTTP calls, stages, caches);
+gauges are computed from callbacks at scrape time. `get_metrics_server()` serves them at
+http://METRICS_HOST:METRICS_PORT/metrics when METRICS_PORT is set.
+"""
+import math
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import METRICS_HOST, METRICS_PORT
+from .util import process_singleton
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = [*zip(labelnames, values), *extra]
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels: `counter.inc(upstream="binance")`."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0.0)
+
+    def label_values(self):
+        with self._lock:
+            return list(self._values)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels: `histogram.observe(0.12, stage="rank")`."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._lock = threading.Lock()
+        self._series = {} # labels -> [bucket counts..., sum]
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        samples = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = (("le", "+Inf" if math.isinf(bound) else repr(bound)),)
+                samples.append((f"{self.name}_bucket", _format_labels(self.labelnames, key, le), cumulative))
+            samples.append((f"{self.name}_sum", _format_labels(self.labelnames, key), series[-1]))
+            samples.append((f"{self.name}_count", _format_labels(self.labelnames, key), cumulative))
+        return samples
+
+
+class CallbackGauge:
+    """Gauge read at scrape time from `callback()`, which returns {label values tuple: value}."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames, callback):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.callback = callback
+
+    def samples(self):
+        try:
+            values = self.callback()
+        except Exception:
+            return [] # A failing callback must not break the whole scrape
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in sorted(values.items())]
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric) # Registering twice keeps the first one
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "scanner_http_requests_total", "Upstream HTTP requests by upstream and status code.", ("upstream", "status")))
+HTTP_DURATION = REGISTRY.register(Histogram(
+    "scanner_http_request_duration_seconds", "Upstream HTTP request latency.", ("upstream",)))
+HTTP_RATE_LIMITED = REGISTRY.register(Counter(
+    "scanner_http_rate_limited_total", "Upstream responses with status 429.", ("upstream",)))
+HTTP_RETRIES = REGISTRY.register(Counter(
+    "scanner_http_retries_total", "Upstream requests retried after a 429 or 5xx response.", ("upstream",)))
+RATE_LIMIT_WAIT = REGISTRY.register(Counter(
+    "scanner_rate_limit_wait_seconds_total", "Time spent waiting for an upstream's rate limiter.", ("upstream",)))
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "scanner_stage_duration_seconds", "Duration of each scan pipeline stage.", ("stage",)))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "scanner_cache_requests_total", "Cache lookups by cache and result (hit, stale, miss).", ("cache", "result")))
+
+
+def _cache_hit_ratios():
+    totals, hits = {}, {}
+    for cache, result in CACHE_REQUESTS.label_values():
+        count = CACHE_REQUESTS.value(cache=cache, result=result)
+        totals[cache] = totals.get(cache, 0.0) + count
+        if result == "hit":
+            hits[cache] = count
+    return {(cache,): hits.get(cache, 0.0) / total for cache, total in totals.items() if total}
+
+
+REGISTRY.register(CallbackGauge(
+    "scanner_cache_hit_ratio", "Share of cache lookups served from the cache since start.", ("cache",), _cache_hit_ratios))
+
+
+def record_cache_lookup(cache, result):
+    """Counts one lookup; `result` is "hit", "miss" or "stale" (served old data while refreshing)."""
+    CACHE_REQUESTS.inc(cache=cache, result=result)
+
+
+def record_http_response(upstream, status, seconds):
+    """Counts one upstream call; `status` is the HTTP status code or "error" when no response arrived."""
+    HTTP_REQUESTS.inc(upstream=upstream, status=status)
+    HTTP_DURATION.observe(seconds, upstream=upstream)
+    if status == 429:
+        HTTP_RATE_LIMITED.inc(upstream=upstream)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        payload = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(host, port):
+    """Serves /metrics from a daemon thread and returns the server."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+@process_singleton
+def get_metrics_server():
+    """The process-wide metrics endpoint, or None when METRICS_PORT is unset or the port is taken."""
+    if not METRICS_PORT:
+        return None
+    try:
+        return start_metrics_server(METRICS_HOST, METRICS_PORT)
+    except OSError as e: # e.g. a second app process on the same host
+        print(f"Metrics endpoint not started on {METRICS_HOST}:{METRICS_PORT}: {e}", file=sys.stderr)
+        return None
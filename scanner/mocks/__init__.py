@@ -0,0 +1,12 @@
+"""
+Local stand-ins for the upstream APIs, for offline demos and reproducible benchmarks.
+
+`MockUpstreamServer` serves CoinGecko /coins/markets, Binance /exchangeInfo and
+/ticker/24hr, and Brave web search from one port, either from a synthetic market of
+any size or from fixtures recorded with SCANNER_RECORD_DIR. `binance_ws` is the
+stand-in for Binance's ticker WebSocket stream.
+"""
+from .server import MockUpstreamServer, point_upstreams_at
+from .synthetic import SyntheticMarket
+
+__all__ = ["MockUpstreamServer", "SyntheticMarket", "point_upstreams_at"]
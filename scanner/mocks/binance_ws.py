@@ -0,0 +1,126 @@
+"""
+Local stand-in for Binance's all-market mini-ticker WebSocket stream.
+
+Serves `!miniTicker@arr`-style arrays over WebSocket, plus the bulk REST
+/api/v3/ticker/24hr endpoint the consumer uses to resync after a gap, so the
+streaming mode of app.py can be exercised without network access:
+
+    python -m scanner.mocks.binance_ws --port 8765 --rest-port 8766 --drop-after 30 --gap-every 20
+    BINANCE_WS_URL=ws://127.0.0.1:8765/ws/!miniTicker@arr \
+    BINANCE_API_URL=http://127.0.0.1:8766 BINANCE_STREAM=1 streamlit run app.py
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import websockets
+
+BASE_SYMBOLS = ["BTC", "ETH", "BNB", "SOL", "XRP", "DOGE", "ADA", "PEPE"]
+
+
+class MarketState:
+    """Random-walk prices and volumes for a fixed set of USDT pairs."""
+
+    def __init__(self, symbol_count):
+        names = BASE_SYMBOLS + [f"MOCK{i}" for i in range(max(0, symbol_count - len(BASE_SYMBOLS)))]
+        self._lock = threading.Lock()
+        self.tickers = {
+            f"{name}USDT": [random.uniform(0.00001, 50000), random.uniform(1e6, 1e9)]
+            for name in names[:symbol_count]
+        }
+
+    def step(self, changed_fraction=0.5):
+        """Moves a random subset of symbols and returns their mini-ticker events."""
+        now_ms = int(time.time() * 1000)
+        events = []
+        with self._lock:
+            for symbol, ticker in self.tickers.items():
+                if random.random() > changed_fraction:
+                    continue # Like Binance, only symbols that changed are pushed
+                ticker[0] *= 1 + random.uniform(-0.002, 0.002)
+                ticker[1] += random.uniform(0, 1e4)
+                events.append(self._mini_ticker(symbol, ticker, now_ms))
+        return events
+
+    def snapshot(self):
+        now_ms = int(time.time() * 1000)
+        with self._lock:
+            return [
+                {"symbol": symbol, "lastPrice": f"{price:.8f}", "quoteVolume": f"{volume:.2f}", "closeTime": now_ms}
+                for symbol, (price, volume) in self.tickers.items()
+            ]
+
+    @staticmethod
+    def _mini_ticker(symbol, ticker, now_ms):
+        price, volume = ticker
+        return {"e": "24hrMiniTicker", "E": now_ms, "s": symbol, "c": f"{price:.8f}", "q": f"{volume:.2f}"}
+
+
+def serve_rest(state, port):
+    """Serves GET /api/v3/ticker/24hr from a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if not self.path.startswith("/api/v3/ticker/24hr"):
+                self.send_error(404)
+                return
+            body = json.dumps(state.snapshot()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, name="mock-binance-rest", daemon=True).start()
+    return server
+
+
+def stream_handler(state, interval, drop_after=0, gap_every=0, gap_seconds=8.0):
+    """WebSocket connection handler pushing `state.step()` arrays every `interval` seconds."""
+
+    async def stream(websocket, *_):
+        sent = 0
+        try:
+            while True:
+                await websocket.send(json.dumps(state.step()))
+                sent += 1
+                if drop_after and sent >= drop_after:
+                    await websocket.close() # Exercises the consumer's reconnect path
+                    return
+                if gap_every and sent % gap_every == 0:
+                    await asyncio.sleep(gap_seconds) # Exercises gap detection and REST resync
+                await asyncio.sleep(interval)
+        except websockets.ConnectionClosed:
+            pass # The consumer recycled the connection (e.g. after detecting a gap)
+
+    return stream
+
+
+async def main(args):
+    state = MarketState(args.symbols)
+    serve_rest(state, args.rest_port)
+    stream = stream_handler(state, args.interval, args.drop_after, args.gap_every, args.gap_seconds)
+
+    async with websockets.serve(stream, "127.0.0.1", args.port):
+        print(f"Mock Binance stream on ws://127.0.0.1:{args.port}/ws/!miniTicker@arr, REST on http://127.0.0.1:{args.rest_port}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rest-port", type=int, default=8766)
+    parser.add_argument("--symbols", type=int, default=400, help="Number of USDT pairs to simulate")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between stream messages")
+    parser.add_argument("--drop-after", type=int, default=0, help="Close each connection after N messages (0 = never)")
+    parser.add_argument("--gap-every", type=int, default=0, help="Pause the stream every N messages (0 = never)")
+    parser.add_argument("--gap-seconds", type=float, default=8.0, help="Length of each pause")
+    asyncio.run(main(parser.parse_args()))
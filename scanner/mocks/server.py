@@ -0,0 +1,173 @@
+"""HTTP mock of the CoinGecko, Binance and Brave endpoints used by the scanner."""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from ..config import UPSTREAMS
+from ..recording import load_fixtures, request_key
+from .synthetic import SyntheticMarket
+
+
+def point_upstreams_at(url):
+    """Routes every upstream of this process to `url` (call before the first request)."""
+    for upstream in UPSTREAMS.values():
+        upstream["base_url"] = url.rstrip("/")
+
+
+class MockUpstreamServer:
+    """
+    Threaded HTTP server answering all three upstream APIs on one port.
+
+    Responses come from recorded fixtures when `fixtures_dir` is given, otherwise from a
+    SyntheticMarket of `coins` coins. Every request waits `latency_ms` (± `jitter_ms`),
+    and fails with a 429 (with Retry-After) or a 500 at the given rates. Binance
+    responses carry an X-MBX-USED-WEIGHT-1M header like the real API.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, coins=2000, fixtures_dir=None,
+                 latency_ms=0.0, jitter_ms=0.0, rate_429=0.0, error_rate=0.0, seed=42):
+        self.market = None if fixtures_dir else SyntheticMarket(coins, seed=seed)
+        self.fixtures = load_fixtures(fixtures_dir) if fixtures_dir else None
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.error_rate = error_rate
+        self.request_count = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._binance_weight = [0, 0] # [minute, used weight in that minute]
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-upstreams", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Request handling ---
+
+    def _draw(self):
+        """Latency and injected fault for one request, drawn under the lock so runs are reproducible."""
+        with self._lock:
+            self.request_count += 1
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self._rng.random()
+        if roll < self.rate_429:
+            return delay, 429
+        if roll < self.rate_429 + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    def _binance_weight_header(self, path, params):
+        if path.endswith("/exchangeInfo"):
+            weight = 20
+        elif path.endswith("/ticker/24hr"):
+            weight = 40 if "symbols" in params else 80
+        elif path.endswith("/ticker"):
+            weight = min(4 * len(json.loads(params["symbols"][0])), 200) if "symbols" in params else 4
+        else:
+            weight = 1
+        minute = int(time.time() // 60)
+        with self._lock:
+            if self._binance_weight[0] != minute:
+                self._binance_weight = [minute, 0]
+            self._binance_weight[1] += weight
+            return {"X-MBX-USED-WEIGHT-1M": str(self._binance_weight[1])}
+
+    def _synthetic_response(self, path, params):
+        """(status, body) for a request against the synthetic market."""
+        first = {name: values[0] for name, values in params.items()}
+        if path == "/api/v3/coins/markets":
+            return 200, self.market.markets_page(int(first.get("page", 1)), int(first.get("per_page", 100)))
+        if path == "/api/v3/exchangeInfo":
+            return 200, self.market.exchange_info()
+        if path == "/api/v3/ticker/24hr":
+            if "symbols" in first:
+                symbols = json.loads(first["symbols"])
+                if any(symbol not in self.market.binance_tickers for symbol in symbols):
+                    return 400, {"code": -1121, "msg": "Invalid symbol."}
+                return 200, [self.market.binance_tickers[symbol] for symbol in symbols]
+            if "symbol" in first:
+                ticker = self.market.binance_tickers.get(first["symbol"])
+                return (200, ticker) if ticker else (400, {"code": -1121, "msg": "Invalid symbol."})
+            return 200, list(self.market.binance_tickers.values())
+        if path == "/api/v3/ticker":
+            symbols = json.loads(first["symbols"]) if "symbols" in first else [first.get("symbol")]
+            if len(symbols) > 100:
+                return 400, {"code": -1101, "msg": "Too many values sent for parameter 'symbols', max 100."}
+            if any(symbol not in self.market.binance_tickers for symbol in symbols):
+                return 400, {"code": -1121, "msg": "Invalid symbol."}
+            tickers = [self.market.rolling_ticker(symbol, first.get("windowSize", "1d")) for symbol in symbols]
+            return 200, tickers if "symbols" in first else tickers[0]
+        if path == "/res/v1/web/search":
+            return 200, self.market.brave_results(first.get("q", ""), int(first.get("count", 3)))
+        return 404, {"error": f"Unknown path {path}"}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real APIs
+            # Headers and body leave in one segment; otherwise delayed ACKs add ~40 ms per request
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = parse_qs(parts.query, keep_blank_values=True)
+                delay, fault = server._draw()
+                if delay:
+                    time.sleep(delay)
+
+                headers = {"Content-Type": "application/json"}
+                if request_key(self.path)[0] == "binance":
+                    headers.update(server._binance_weight_header(parts.path, params))
+                if fault == 429:
+                    self._send(429, {"error": "Too Many Requests"}, {**headers, "Retry-After": "1"})
+                elif fault == 500:
+                    self._send(500, {"error": "Injected server error"}, headers)
+                elif server.fixtures is not None:
+                    fixture = server.fixtures.get(request_key(self.path))
+                    if fixture is None:
+                        self._send(404, {"error": f"No fixture for {self.path}"}, headers)
+                    else:
+                        self._send(fixture["status"], fixture["body"], {**fixture["headers"], **headers})
+                else:
+                    status, body = server._synthetic_response(parts.path, params)
+                    self._send(status, body, headers)
+
+            def _send(self, status, body, headers):
+                payload = (body if isinstance(body, str) else json.dumps(body)).encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,112 @@
+"""Deterministic synthetic market data shaped like the real upstream payloads."""
+import math
+import random
+from datetime import datetime, timezone
+
+
+class SyntheticMarket:
+    """
+    A universe of `coins` fake coins, ordered by market cap like /coins/markets.
+    Every third coin has a Binance USDT pair; some coins lack a 24h change or have low
+    volume, so the scanner's filters have something to do.
+    """
+
+    def __init__(self, coins=2000, seed=42):
+        self.seed = seed
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        self.coins = []
+        for rank in range(1, coins + 1):
+            price = 10 ** rng.uniform(-6, 4.5)
+            supply = 10 ** rng.uniform(6, 11)
+            change = None if rng.random() < 0.03 else rng.gauss(0, 8)
+            volume = 10 ** rng.uniform(4, 10)
+            self.coins.append({
+                "id": f"mock-coin-{rank}",
+                "symbol": f"mc{rank}",
+                "name": f"Mock Coin {rank}",
+                "image": f"https://example.invalid/coins/{rank}.png",
+                "current_price": price,
+                "market_cap": price * supply,
+                "market_cap_rank": rank,
+                "fully_diluted_valuation": price * supply * 1.2,
+                "total_volume": volume,
+                "high_24h": price * 1.05,
+                "low_24h": price * 0.95,
+                "price_change_24h": price * (change or 0) / 100,
+                "price_change_percentage_24h": change,
+                "market_cap_change_24h": price * supply * (change or 0) / 100,
+                "market_cap_change_percentage_24h": change,
+                "circulating_supply": supply,
+                "total_supply": supply * 1.2,
+                "max_supply": None,
+                "ath": price * 3,
+                "ath_change_percentage": -66.7,
+                "ath_date": "2021-11-10T14:24:11.849Z",
+                "atl": price / 10,
+                "atl_change_percentage": 900.0,
+                "atl_date": "2020-03-13T02:22:55.044Z",
+                "roi": None,
+                "last_updated": now,
+                "price_change_percentage_1h_in_currency": None if change is None else change / 12 + rng.gauss(0, 1),
+                "price_change_percentage_24h_in_currency": change,
+                "price_change_percentage_7d_in_currency": None if change is None else change + rng.gauss(0, 15),
+                "price_change_percentage_14d_in_currency": None if change is None else change + rng.gauss(0, 25),
+                "price_change_percentage_30d_in_currency": None if change is None else change + rng.gauss(0, 40),
+                "price_change_percentage_1y_in_currency": None if rng.random() < 0.1 else rng.gauss(20, 150),
+            })
+        # /coins/markets is ordered by market cap
+        self.coins.sort(key=lambda coin: coin["market_cap"], reverse=True)
+        self.binance_tickers = {
+            f"{coin['symbol'].upper()}USDT": {
+                "symbol": f"{coin['symbol'].upper()}USDT",
+                "openPrice": f"{coin['current_price']:.8f}",
+                "highPrice": f"{coin['high_24h']:.8f}",
+                "lowPrice": f"{coin['low_24h']:.8f}",
+                "lastPrice": f"{coin['current_price'] * rng.uniform(0.995, 1.005):.8f}",
+                "volume": f"{coin['total_volume'] / coin['current_price']:.2f}",
+                "quoteVolume": f"{coin['total_volume'] * rng.uniform(0.1, 0.6):.2f}",
+                "openTime": 0,
+                "closeTime": 0,
+                "firstId": 0,
+                "lastId": 0,
+                "count": 0,
+            }
+            for index, coin in enumerate(self.coins) if index % 3 == 0
+        }
+
+    def rolling_ticker(self, symbol, window_size):
+        """MINI /api/v3/ticker entry over `window_size` (e.g. "15m"), deterministic per symbol and window."""
+        ticker = self.binance_tickers[symbol]
+        minutes = int(window_size[:-1]) * {"m": 1, "h": 60, "d": 1440}[window_size[-1]]
+        change = random.Random(f"{self.seed}:{symbol}:{window_size}").gauss(0, 0.3 * math.sqrt(minutes / 15))
+        last_price = float(ticker["lastPrice"])
+        return {**ticker, "openPrice": f"{last_price / (1 + change / 100):.8f}"}
+
+    def markets_page(self, page, per_page):
+        start = (page - 1) * per_page
+        return self.coins[start:start + per_page]
+
+    def exchange_info(self):
+        return {
+            "timezone": "UTC",
+            "symbols": [
+                {"symbol": symbol, "status": "TRADING", "baseAsset": symbol[:-4], "quoteAsset": "USDT"}
+                for symbol in self.binance_tickers
+            ],
+        }
+
+    def brave_results(self, query, count):
+        return {
+            "news": {
+                "results": [
+                    {
+                        "title": f"{query} — headline {i + 1}",
+                        "url": f"https://example.invalid/news/{i + 1}",
+                        "description": f"Synthetic news item {i + 1} for '{query}'.",
+                        "meta_url": {"hostname": "example.invalid"},
+                    }
+                    for i in range(count)
+                ]
+            }
+        }
@@ -0,0 +1,49 @@
+"""Structured scan results shared by the engine, the Streamlit app and the CLI."""
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING: # Annotations only: importing models (and the cache) must not load pandas
+    import pandas as pd
+
+
+@dataclass(frozen=True)
+class ScanError:
+    """
+    A problem met during a scan. `level` is "error", "warning" or "info";
+    `source` names the upstream ("coingecko", "binance", "brave") or "scan".
+    """
+    source: str
+    level: str
+    message: str
+    status_code: Optional[int] = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+    One scan result. Shared by every session that reads it, so it must never be mutated.
+    `market_df` holds every eligible coin with its change in each window, so any window
+    is re-ranked locally; `binance_df` has the Binance columns of every coin that can
+    appear in a ranking, indexed by symbol; `coins_df` is the default window's table.
+    `restored` marks a snapshot loaded from disk at startup rather than fetched by this process.
+    """
+    market_df: "pd.DataFrame"
+    binance_df: "pd.DataFrame"
+    coins_df: "pd.DataFrame"
+    fetched_at_utc: datetime
+    restored: bool = False
+
+
+@dataclass(frozen=True)
+class ScanResult:
+    """What a scan produced: a snapshot (None when the scan failed) plus everything that went wrong."""
+    snapshot: Optional[MarketSnapshot]
+    errors: tuple = field(default_factory=tuple)
+
+    @property
+    def ok(self):
+        return self.snapshot is not None
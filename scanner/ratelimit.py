@@ -0,0 +1,205 @@
+"""
+Per-upstream adaptive rate limiting.
+
+Each upstream has one AdaptiveRateLimiter shared by every thread of the process. Before
+a request goes out, `acquire()` waits for:
+
+* a token from the upstream's request budget (CoinGecko calls per minute, Brave requests
+  per second), refilled continuously so throughput stays at the allowed maximum;
+* room in Binance's per-minute request weight, tracked locally and corrected from the
+  X-MBX-USED-WEIGHT-1M header, which also counts other clients on the same IP;
+* the end of any back-off announced by the provider (Retry-After, Brave's
+  X-RateLimit-Remaining/Reset).
+
+`observe()` feeds every response back: a 429 blocks the upstream for Retry-After seconds
+and halves its pace, and successes slowly restore it.
+"""
+import hashlib
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from .config import BINANCE_WEIGHT_LIMIT_1M, BRAVE_RATE_LIMIT_RPS, COINGECKO_CALLS_PER_MINUTE, COINGECKO_MAX_WORKERS
+from .metrics import REGISTRY, CallbackGauge
+from .util import process_singleton
+
+RATE_LIMITED_STATUSES = (418, 429) # Binance answers 418 once an IP is banned for ignoring 429s
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+WEIGHT_SAFETY = 0.9 # Keep 10% of the Binance weight budget for other clients on the same IP
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 8.0
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe limiter for one upstream. `rate` is in requests per second (None: no
+    pacing) with bursts of up to `burst` requests; `weight_limit` is a per-minute request
+    weight budget (None: not tracked).
+    """
+
+    def __init__(self, name, rate=None, burst=1, weight_limit=None):
+        self.name = name
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0 # Monotonic time before which nothing is sent
+        self._used_weight = 0
+        self._weight_minute = None # Epoch minute the used weight belongs to
+        self.set_budget(rate, burst, weight_limit)
+
+    def set_budget(self, rate=None, burst=1, weight_limit=None):
+        """Replaces the request and weight budgets (None disables each)."""
+        with self._lock:
+            self.max_rate = rate
+            self.rate = rate
+            self.burst = burst
+            self.weight_limit = weight_limit
+            self._tokens = float(burst)
+            self._updated = time.monotonic()
+
+    @property
+    def used_weight(self):
+        with self._lock:
+            return self._used_weight if self._weight_minute == int(time.time() // 60) else 0
+
+    def _reserve(self, weight):
+        """Reserves a slot for one request and returns how long to wait before sending it. Caller holds the lock."""
+        now = time.monotonic()
+        wait = self._blocked_until - now
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1 # May go negative: later callers queue behind this reservation
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+        if self.weight_limit:
+            minute = int(time.time() // 60)
+            if self._weight_minute is None or minute > self._weight_minute:
+                self._weight_minute, self._used_weight = minute, 0
+            if self._used_weight + weight > self.weight_limit * WEIGHT_SAFETY:
+                self._weight_minute, self._used_weight = self._weight_minute + 1, 0 # Next window
+            wait = max(wait, self._weight_minute * 60 - time.time())
+            self._used_weight += weight
+        return max(0.0, wait)
+
+    def acquire(self, weight=1):
+        """Blocks until a request of the given weight may be sent; returns the seconds waited."""
+        with self._lock:
+            wait = self._reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def observe(self, response):
+        """
+        Updates the limiter from a response's status and headers. Returns the provider's
+        Retry-After in seconds when it sent one with a rate-limit or retryable status.
+        """
+        headers = response.headers
+        status = response.status_code
+        retry_after = None
+        if status in RATE_LIMITED_STATUSES or status in RETRYABLE_STATUSES:
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+
+        with self._lock:
+            now = time.monotonic()
+            used_weight = headers.get("X-MBX-USED-WEIGHT-1M")
+            if self.weight_limit and used_weight and used_weight.isdigit():
+                if self._weight_minute == int(time.time() // 60):
+                    self._used_weight = max(self._used_weight, int(used_weight)) # The header is authoritative
+
+            # Brave sends "per-second, per-month" pairs, e.g. Remaining "0, 1999" and Reset "1, 2419200"
+            remaining = headers.get("X-RateLimit-Remaining", "").split(",")[0].strip()
+            reset = headers.get("X-RateLimit-Reset", "").split(",")[0].strip()
+            if remaining == "0" and reset.replace(".", "", 1).isdigit():
+                self._blocked_until = max(self._blocked_until, now + float(reset))
+
+            if status in RATE_LIMITED_STATUSES:
+                if retry_after is not None:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+                if self.rate:
+                    self.rate = max(self.max_rate * 0.1, self.rate * 0.5) # Multiplicative decrease
+            elif status < 400 and self.rate and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05) # Additive recovery
+        return retry_after
+
+
+def per_minute_limiter(name, calls_per_minute, burst):
+    """
+    Limiter allowing at most `calls_per_minute` calls in any 60 seconds: `burst` calls may
+    go out at once and the rest of the minute's budget refills evenly. A bucket refilling
+    the full budget on top of its burst would let up to twice the budget through.
+    """
+    if not calls_per_minute:
+        return AdaptiveRateLimiter(name)
+    burst = max(1, min(int(burst), int(calls_per_minute) - 1))
+    return AdaptiveRateLimiter(name, rate=(calls_per_minute - burst) / 60, burst=burst)
+
+
+@process_singleton
+def get_rate_limiters():
+    """The process-wide AdaptiveRateLimiter of every upstream, by upstream name."""
+    return {
+        "coingecko": per_minute_limiter("coingecko", COINGECKO_CALLS_PER_MINUTE, burst=COINGECKO_MAX_WORKERS),
+        "binance": AdaptiveRateLimiter("binance", weight_limit=BINANCE_WEIGHT_LIMIT_1M or None),
+        "brave": AdaptiveRateLimiter("brave", rate=BRAVE_RATE_LIMIT_RPS or None),
+    }
+
+
+def get_rate_limiter(upstream):
+    return get_rate_limiters()[upstream]
+
+
+class KeyedRateLimiters:
+    """
+    One AdaptiveRateLimiter per API key of an upstream whose budget belongs to each key
+    (Brave plans are per subscription), so the rate a session sets for its own key never
+    paces, or unpaces, sessions using another key.
+    """
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self._lock = threading.Lock()
+        self._limiters = {} # sha256 prefix of the key -> limiter; keys themselves are not kept
+
+    def get(self, api_key, rate):
+        """The limiter of `api_key`, paced at `rate` requests per second (re-budgeted when the rate changes)."""
+        digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        with self._lock:
+            limiter = self._limiters.get(digest)
+            if limiter is None:
+                limiter = self._limiters[digest] = AdaptiveRateLimiter(f"{self.upstream}:{digest[:8]}", rate=rate)
+        if limiter.max_rate != rate:
+            limiter.set_budget(rate)
+        return limiter
+
+
+@process_singleton
+def get_brave_key_limiters():
+    """Per-key Brave limiters shared by every session of the process."""
+    return KeyedRateLimiters("brave")
+
+
+REGISTRY.register(CallbackGauge(
+    "scanner_binance_used_weight_1m", "Binance request weight used in the current minute.", (),
+    lambda: {(): get_rate_limiter("binance").used_weight},
+))
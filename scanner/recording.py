@@ -0,0 +1,112 @@
+"""
+Record/replay transport for the upstream APIs.
+
+Recording writes every upstream response (status, relevant headers and body) to one JSON
+fixture file per distinct request. Replay serves those fixtures through a requests
+adapter, so scans run without network access; the mock servers in scanner.mocks serve
+the same files over HTTP. Authentication headers are never part of a fixture.
+"""
+import hashlib
+import json
+import os
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .config import UPSTREAMS
+
+# Response headers worth keeping: content type plus the rate-limit signals of each provider
+RECORDED_HEADERS = ("content-type", "retry-after", "x-mbx-used-weight", "x-mbx-used-weight-1m", "x-ratelimit-limit",
+                    "x-ratelimit-remaining", "x-ratelimit-reset")
+
+
+def upstream_for_path(path):
+    """Which upstream an API path belongs to (the three APIs use disjoint paths)."""
+    if path.startswith("/res/"):
+        return "brave"
+    if path.startswith("/api/v3/coins"):
+        return "coingecko"
+    return "binance"
+
+
+def request_key(url):
+    """(upstream, path, sorted query params) identifying a request independently of host and parameter order."""
+    parts = urlsplit(url)
+    return upstream_for_path(parts.path), parts.path, tuple(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+
+def fixture_filename(key):
+    """Stable, readable file name for a request key."""
+    upstream, path, params = key
+    digest = hashlib.sha1(json.dumps(params).encode("utf-8")).hexdigest()[:12]
+    return f"{upstream}{path.replace('/', '_')}__{digest}.json"
+
+
+def save_fixture(directory, response):
+    """Writes one response to `directory` as a fixture file."""
+    key = request_key(response.request.url)
+    fixture = {
+        "upstream": key[0],
+        "path": key[1],
+        "params": [list(pair) for pair in key[2]],
+        "status": response.status_code,
+        "headers": {name: value for name, value in response.headers.items() if name.lower() in RECORDED_HEADERS},
+        "body": response.text,
+    }
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, fixture_filename(key)), "w", encoding="utf-8") as f:
+        json.dump(fixture, f, ensure_ascii=False)
+
+
+def load_fixtures(directory):
+    """Loads every fixture in `directory` into a {request key: fixture} dict."""
+    fixtures = {}
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            fixture = json.load(f)
+        key = (fixture["upstream"], fixture["path"], tuple(tuple(pair) for pair in fixture["params"]))
+        fixtures[key] = fixture
+    return fixtures
+
+
+def install_recorder(session, directory):
+    """Makes `session` save every upstream response it receives into `directory`."""
+    def record(response, *args, **kwargs):
+        save_fixture(directory, response)
+        return response
+    session.hooks["response"].append(record)
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests adapter answering from recorded fixtures; unknown requests fail like an unreachable host."""
+
+    def __init__(self, fixtures):
+        super().__init__()
+        self.fixtures = fixtures
+
+    def send(self, request, **kwargs):
+        fixture = self.fixtures.get(request_key(request.url))
+        if fixture is None:
+            raise requests.exceptions.ConnectionError(f"No recorded fixture for {request.url}", request=request)
+        response = requests.Response()
+        response.status_code = fixture["status"]
+        response.headers = CaseInsensitiveDict(fixture["headers"])
+        response._content = fixture["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def install_replay(session, directory):
+    """Routes every upstream of `session` to the fixtures recorded in `directory`."""
+    adapter = ReplayAdapter(load_fixtures(directory))
+    for upstream in UPSTREAMS.values():
+        session.mount(upstream["base_url"], adapter)
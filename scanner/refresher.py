@@ -0,0 +1,71 @@
+"""Background thread that keeps the shared snapshot for the default scan depth fresh."""
+import threading
+import time
+from datetime import datetime
+
+from .cache import get_snapshot_cache, snapshot_cache_key
+from .config import BACKGROUND_REFRESH_SECONDS, COINGECKO_API_KEY, DEFAULT_SCAN_PAGES
+from .util import process_singleton
+
+
+class SnapshotRefresher:
+    """
+    Daemon thread that rebuilds the snapshot for the default scan depth every `interval`
+    seconds and publishes it to the shared SnapshotCache, so page loads never wait on HTTP.
+    It runs outside any browser session, so it uses the .env API key.
+    """
+
+    def __init__(self, cache, key, pages, interval):
+        self.cache = cache
+        self.key = key
+        self.pages = pages
+        self.interval = interval
+        self.last_refresh_utc = None
+        self.last_duration_s = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh_once(self):
+        """Builds one snapshot and publishes it. ttl=0 forces a fetch, still coalesced with in-flight ones."""
+        from .engine import run_recorded_scan # Deferred: pandas and the HTTP clients load with the first refresh
+
+        started = time.perf_counter()
+        try:
+            result = self.cache.get_or_fetch(
+                snapshot_cache_key(self.pages),
+                lambda: run_recorded_scan(self.key, self.pages),
+                ttl=0,
+            )
+            failures = [error.message for error in result.errors if error.level == "error"]
+            if result.ok:
+                self.last_error = None
+            else:
+                self.last_error = failures[0] if failures else "A busca não retornou dados."
+        except Exception as e:
+            self.last_error = str(e)[:200]
+        self.last_duration_s = time.perf_counter() - started
+        self.last_refresh_utc = datetime.utcnow()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh_once()
+            self._stop.wait(self.interval)
+
+
+@process_singleton
+def get_snapshot_refresher():
+    """
+    Starts the process-wide refresher on first call; returns None when it is disabled
+    (BACKGROUND_REFRESH_SECONDS <= 0) or no COINGECKO_API_KEY is configured.
+    """
+    if BACKGROUND_REFRESH_SECONDS <= 0 or not COINGECKO_API_KEY:
+        return None
+    return SnapshotRefresher(get_snapshot_cache(), COINGECKO_API_KEY, DEFAULT_SCAN_PAGES, BACKGROUND_REFRESH_SECONDS).start()
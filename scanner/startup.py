@@ -0,0 +1,146 @@
+"""
+Cold-start profile of the Streamlit app.
+
+Every measurement runs in a fresh interpreter, like a new container would:
+
+* the wall time of importing each heavy module alone (parent packages included);
+* for app.py under streamlit.testing: the time until the first element is sent to the
+  browser, and the duration of the first (cold) and second (warm) script runs.
+
+Results are medians over `runs`, saved as JSON so versions can be compared:
+
+    python -m scanner startup --output before.json
+    python -m scanner startup --output after.json --baseline before.json
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+IMPORT_MODULES = (
+    "streamlit", "pandas", "numpy", "pyarrow", "altair", "requests",
+    "scanner.cache", "scanner.engine", "scanner.charts", "scanner.brave",
+)
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, "app.py")
+
+# Runs inside the child interpreter and prints one JSON line of timings in milliseconds
+RENDER_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+first_element = []
+try:
+    from streamlit.runtime.scriptrunner_utils import script_run_context
+    enqueue = script_run_context.ScriptRunContext.enqueue
+    def timed_enqueue(self, msg):
+        if not first_element:
+            first_element.append(time.perf_counter())
+        return enqueue(self, msg)
+    script_run_context.ScriptRunContext.enqueue = timed_enqueue
+except (ImportError, AttributeError):
+    pass # Other Streamlit layout: only the run durations are reported
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+first_start = time.perf_counter()
+at.run()
+first_end = time.perf_counter()
+at.run()
+second_end = time.perf_counter()
+print(json.dumps({
+    "streamlit_import_ms": (imported - started) * 1000,
+    "first_element_ms": (first_element[0] - first_start) * 1000 if first_element else None,
+    "first_run_ms": (first_end - first_start) * 1000,
+    "second_run_ms": (second_end - first_end) * 1000,
+    "exceptions": len(at.exception),
+}))
+"""
+
+
+def _child_env():
+    # No API key and no refresher: the profile must not depend on (or wait for) the network
+    return {**os.environ, "COINGECKO_API_KEY": "", "BACKGROUND_REFRESH_SECONDS": "0", "METRICS_PORT": "0"}
+
+
+def measure_import(module):
+    """Time to import `module` (and whatever it pulls in) in a fresh interpreter, in milliseconds."""
+    code = f"import time; started = time.perf_counter(); import {module}; print((time.perf_counter() - started) * 1000)"
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, cwd=REPO_DIR, env=_child_env(), check=True,
+    )
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_render(app_path=APP_PATH):
+    """First-element and script run timings of app.py in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, "-c", RENDER_PROBE, app_path],
+        capture_output=True, text=True, cwd=REPO_DIR, env=_child_env(), check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _median(values):
+    values = [value for value in values if value is not None]
+    return round(statistics.median(values), 3) if values else None
+
+
+def run_startup_profile(runs=5, modules=IMPORT_MODULES, app_path=APP_PATH, log=sys.stderr):
+    """Profiles imports and app rendering `runs` times each and returns the results document."""
+    imports = {module: _median([measure_import(module) for _ in range(runs)]) for module in modules}
+    renders = [measure_render(app_path) for _ in range(runs)]
+    render = {
+        name: _median([sample[name] for sample in renders])
+        for name in ("streamlit_import_ms", "first_element_ms", "first_run_ms", "second_run_ms")
+    }
+    render["exceptions"] = max(sample["exceptions"] for sample in renders)
+    print(f"first element {render['first_element_ms']} ms, first run {render['first_run_ms']} ms, "
+          f"second run {render['second_run_ms']} ms", file=log)
+
+    try:
+        import streamlit
+        streamlit_version = streamlit.__version__
+    except ImportError:
+        streamlit_version = None
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  cwd=REPO_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "meta": {
+            "created_at_utc": datetime.now(timezone.utc).isoformat(),
+            "revision": revision,
+            "python": platform.python_version(),
+            "streamlit": streamlit_version,
+            "platform": platform.platform(),
+            "runs": runs,
+        },
+        "imports_ms": imports,
+        "render_ms": render,
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """Lines comparing every timing present in both documents, and whether the first run got slower than `threshold`."""
+    lines, regressed = [], False
+    for section in ("imports_ms", "render_ms"):
+        lines.append(section)
+        for name, now in current[section].items():
+            before = baseline.get(section, {}).get(name)
+            if name == "exceptions" or now is None or before is None:
+                continue
+            change = (now - before) / before if before else 0.0
+            flag = ""
+            if section == "render_ms" and name == "first_run_ms" and now > before * (1 + threshold):
+                flag, regressed = "  REGRESSION", True
+            lines.append(f"  {name:<20}{before:9.1f} -> {now:9.1f} ms ({change:+6.1%}){flag}")
+    return lines, regressed
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,162 @@
+"""Optional streaming mode: Binance all-market mini-ticker WebSocket feeding a live price table."""
+import asyncio
+import json
+import random
+import threading
+import time
+from array import array
+
+from .binance import fetch_binance_24h_tickers
+from .config import BINANCE_STREAM_GAP_SECONDS, BINANCE_WS_URL
+from .util import process_singleton
+
+
+class LiveTickerTable:
+    """
+    Compact in-memory table of lastPrice / quoteVolume per symbol, updated in place.
+    Each symbol owns a fixed slot in three typed arrays, so an update never allocates.
+    `get()` returns the same shape as a REST ticker, so check_binance_data can use it as a ticker index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = {} # symbol -> slot index
+        self._prices = array('d')
+        self._volumes = array('d')
+        self._event_ms = array('q')
+
+    def update(self, symbol, price, quote_volume, event_ms):
+        with self._lock:
+            slot = self._slots.get(symbol)
+            if slot is None:
+                self._slots[symbol] = len(self._prices)
+                self._prices.append(price)
+                self._volumes.append(quote_volume)
+                self._event_ms.append(event_ms)
+            elif event_ms >= self._event_ms[slot]: # Never let an older event overwrite a newer one
+                self._prices[slot] = price
+                self._volumes[slot] = quote_volume
+                self._event_ms[slot] = event_ms
+
+    def get(self, symbol, default=None):
+        with self._lock:
+            slot = self._slots.get(symbol)
+            if slot is None:
+                return default
+            return {"symbol": symbol, "lastPrice": self._prices[slot], "quoteVolume": self._volumes[slot]}
+
+    def __len__(self):
+        return len(self._slots)
+
+
+class BinanceTickerStream:
+    """
+    Background consumer of Binance's all-market mini-ticker stream feeding a LiveTickerTable.
+    Reconnects with exponential backoff. A silence longer than `gap_seconds` (or a jump in
+    event time of the same size) is treated as a gap: the connection is recycled and the
+    table is resynchronised from one bulk REST /ticker/24hr call before trusting it again.
+    """
+
+    def __init__(self, url, gap_seconds):
+        self.url = url
+        self.gap_seconds = gap_seconds
+        self.table = LiveTickerTable()
+        self.connected = False
+        self.reconnects = 0
+        self.gaps = 0
+        self.last_error = None
+        self._last_message = 0.0 # time.monotonic() of the last stream message
+        self._last_event_ms = None
+        self._needs_resync = True
+        self._last_resync_attempt = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Starts the consumer thread once; later calls are no-ops."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), name="binance-ticker-stream", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def is_fresh(self):
+        """True when the table is synchronised and the stream delivered data within the gap window."""
+        return (
+            self.connected and not self._needs_resync
+            and time.monotonic() - self._last_message < self.gap_seconds
+        )
+
+    def _resync_from_rest(self):
+        for ticker in fetch_binance_24h_tickers():
+            self.table.update(ticker['symbol'], float(ticker['lastPrice']), float(ticker['quoteVolume']), int(ticker.get('closeTime', 0)))
+        self._needs_resync = False
+
+    async def _try_resync(self):
+        """Resyncs off the event loop; on failure the table stays marked stale and is retried after a gap window."""
+        self._last_resync_attempt = time.monotonic()
+        try:
+            await asyncio.to_thread(self._resync_from_rest)
+        except Exception as e:
+            self.last_error = f"Resync REST falhou: {str(e)[:150]}"
+
+    def _apply(self, events):
+        for event in events:
+            self.table.update(event['s'], float(event['c']), float(event['q']), int(event['E']))
+            if self._last_event_ms is not None and event['E'] - self._last_event_ms > self.gap_seconds * 1000:
+                self.gaps += 1
+                self._needs_resync = True
+            self._last_event_ms = max(self._last_event_ms or 0, event['E'])
+
+    async def _run(self):
+        import websockets # Optional dependency, only needed in streaming mode
+
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(self.url, open_timeout=10, ping_interval=20, max_size=None) as ws:
+                    self.connected = True
+                    self.last_error = None
+                    backoff = 1.0
+                    while not self._stop.is_set():
+                        try:
+                            raw = await asyncio.wait_for(ws.recv(), timeout=self.gap_seconds)
+                        except asyncio.TimeoutError:
+                            self.gaps += 1
+                            self._needs_resync = True
+                            break # Recycle a silent connection
+                        self._last_message = time.monotonic()
+                        payload = json.loads(raw)
+                        self._apply(payload if isinstance(payload, list) else [payload])
+                        if self._needs_resync and time.monotonic() - self._last_resync_attempt >= self.gap_seconds:
+                            await self._try_resync()
+            except Exception as e:
+                self.last_error = str(e)[:200]
+            self.connected = False
+            self._needs_resync = True
+            self._last_event_ms = None
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            await asyncio.sleep(backoff + random.uniform(0, backoff / 2))
+            backoff = min(backoff * 2, 60.0)
+
+
+@process_singleton
+def get_binance_ticker_stream():
+    """The process-wide stream consumer; it only connects once someone calls start()."""
+    return BinanceTickerStream(BINANCE_WS_URL, BINANCE_STREAM_GAP_SECONDS)
+
+
+def apply_live_binance_prices(coins_df, live_table):
+    """Returns a copy of coins_df with Binance price/volume replaced by the live stream values."""
+    live_df = coins_df.copy()
+    listed = live_df["Status Binance"] == "✅ Na Binance"
+    for row_index in live_df.index[listed]:
+        ticker = live_table.get(f"{live_df.at[row_index, 'Símbolo']}USDT")
+        if ticker is not None:
+            live_df.at[row_index, "Preço Binance (USD)"] = ticker["lastPrice"]
+            live_df.at[row_index, "Volume Binance (24h)"] = ticker["quoteVolume"]
+    return live_df
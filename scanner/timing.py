@@ -0,0 +1,40 @@
+"""
+Per-stage wall-clock timings of the scan pipeline.
+
+The pipeline wraps its stages in `stage(name)`. Every stage is observed in the
+scanner_stage_duration_seconds histogram; callers inside `collect_stage_timings()` (the
+benchmark) also get the durations of their own thread as a dict.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from .metrics import STAGE_DURATION
+
+_local = threading.local()
+
+
+@contextmanager
+def collect_stage_timings():
+    """Yields a dict that receives the seconds spent in each stage() run by this thread."""
+    previous = getattr(_local, "timings", None)
+    timings = {}
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+
+@contextmanager
+def stage(name):
+    """Times the enclosed block as pipeline stage `name` (durations of repeated stages add up)."""
+    timings = getattr(_local, "timings", None)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.observe(elapsed, stage=name)
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
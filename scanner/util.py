@@ -0,0 +1,22 @@
+"""Small helpers shared by the scanner modules."""
+import threading
+from functools import wraps
+
+
+def process_singleton(factory):
+    """
+    Decorator for zero-argument factories: the first call builds the object, every later
+    call (from any thread) returns that same object for the lifetime of the process.
+    """
+    lock = threading.Lock()
+    instance = []
+
+    @wraps(factory)
+    def get():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return get
@@ -0,0 +1,28 @@
+import pytest
+
+from scanner import brave, cache, ratelimit
+
+
+class FakeClock:
+    """Stands in for the `time` module of the code under test; sleeping advances it."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake time for the cache, the rate limiters and the news cache."""
+    fake = FakeClock()
+    for module in (cache, ratelimit, brave):
+        monkeypatch.setattr(module, "time", fake)
+    return fake
@@ -0,0 +1,139 @@
+"""Tests for the Binance helpers: bulk 24h tickers, coin checks and rolling-window changes."""
+import pytest
+import requests
+
+from scanner import binance
+from scanner.binance import (
+    RollingChangesCache, check_binance_data, get_binance_rolling_changes, get_binance_ticker_index, rolling_window_ttl,
+)
+from scanner.ratelimit import AdaptiveRateLimiter
+
+
+@pytest.fixture
+def rolling(monkeypatch):
+    """Fresh rolling cache and Binance limiter; records every /api/v3/ticker batch instead of calling Binance."""
+    cache = RollingChangesCache()
+    limiter = AdaptiveRateLimiter("binance", weight_limit=1000)
+    calls = []
+
+    def fetch(symbols, window):
+        calls.append((window, list(symbols)))
+        return [{"symbol": symbol, "openPrice": "100", "lastPrice": "110"} for symbol in symbols], None
+
+    monkeypatch.setattr(binance, "get_rolling_changes_cache", lambda: cache)
+    monkeypatch.setattr(binance, "get_rate_limiter", lambda upstream: limiter)
+    monkeypatch.setattr(binance, "fetch_binance_rolling_tickers", fetch)
+    return cache, calls
+
+
+def test_rolling_window_ttl_scales_with_window():
+    assert rolling_window_ttl("15m-binance") == 15 * 60 / binance.BINANCE_ROLLING_TTL_DIVISOR
+    assert rolling_window_ttl("12h-binance") == 48 * rolling_window_ttl("15m-binance")
+
+
+def test_rolling_changes_are_reused_until_they_expire(rolling):
+    cache, calls = rolling
+    errors = []
+    changes = get_binance_rolling_changes(["AUSDT", "BUSDT"], ["15m-binance"], errors)
+    assert changes["15m-binance"] == {"AUSDT": pytest.approx(10), "BUSDT": pytest.approx(10)}
+    assert errors == []
+
+    get_binance_rolling_changes(["AUSDT", "BUSDT"], ["15m-binance"], errors)
+    assert len(calls) == 1
+
+    get_binance_rolling_changes(["AUSDT", "CUSDT"], ["15m-binance"], errors)
+    assert calls[-1] == ("15m-binance", ["CUSDT"]) # Only the symbol not cached yet
+
+
+def test_claimed_symbols_are_not_fetched_twice():
+    cache = RollingChangesCache()
+    assert cache.claim("1h-binance", ["AUSDT", "BUSDT"], ttl=60) == ["AUSDT", "BUSDT"]
+    assert cache.claim("1h-binance", ["AUSDT", "BUSDT"], ttl=60) == [] # Another scan is fetching them
+    cache.release("1h-binance", ["BUSDT"])
+    assert cache.claim("1h-binance", ["AUSDT", "BUSDT"], ttl=60) == ["BUSDT"]
+
+
+def test_rolling_weight_over_the_scan_share_is_deferred(rolling):
+    cache, calls = rolling
+    symbols = sorted(f"S{i}USDT" for i in range(300)) # 3 batches of weight 200 per window
+    errors = []
+    changes = get_binance_rolling_changes(symbols, ["15m-binance", "1h-binance"], errors)
+
+    # Budget: (1000 * 90%) * 50% = 450 weight, i.e. two batches, short window first
+    assert calls == [("15m-binance", symbols[:100]), ("15m-binance", symbols[100:200])]
+    assert len(changes["15m-binance"]) == 200 and changes["1h-binance"] == {}
+    assert [error.level for error in errors] == ["info"]
+    assert cache.claim("1h-binance", symbols, ttl=60) == symbols # Deferred batches are due again
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload, self.status_code = payload, status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(response=self)
+
+    def json(self):
+        return self.payload
+
+
+@pytest.fixture
+def ticker_calls(monkeypatch):
+    """Answers /ticker/24hr with a ticker for every symbol of a small market; records (weight, params)."""
+    market = [{"symbol": f"S{i}USDT", "lastPrice": str(i), "quoteVolume": str(i * 1000)} for i in range(300)]
+    calls = []
+
+    def http_get(upstream, path, weight=1, **kwargs):
+        calls.append((weight, kwargs["params"]))
+        return FakeResponse(market)
+
+    monkeypatch.setattr(binance, "http_get", http_get)
+    return calls
+
+
+def test_ticker_index_uses_one_bulk_call(ticker_calls):
+    errors = []
+    index = get_binance_ticker_index(["S1USDT", "S2USDT", "S1USDT"], errors)
+
+    assert len(ticker_calls) == 1
+    weight, params = ticker_calls[0]
+    assert params["symbols"] == '["S1USDT","S2USDT"]' and weight == 2
+    assert sorted(index) == ["S1USDT", "S2USDT"] # Other tickers in the response are dropped
+    assert errors == []
+
+
+def test_ticker_index_switches_to_the_whole_market_for_large_batches(ticker_calls):
+    symbols = [f"S{i}USDT" for i in range(150)]
+    index = get_binance_ticker_index(symbols, [])
+
+    weight, params = ticker_calls[0]
+    assert "symbols" not in params and weight == 80
+    assert len(index) == 150
+
+
+def test_ticker_index_reports_failures(monkeypatch):
+    monkeypatch.setattr(binance, "http_get", lambda *args, **kwargs: FakeResponse([], status_code=418))
+    errors = []
+    assert get_binance_ticker_index(["S1USDT"], errors) is None
+    assert [(error.level, error.status_code) for error in errors] == [("warning", 418)]
+    assert get_binance_ticker_index([], errors) == {}
+
+
+def test_check_binance_data_statuses():
+    pairs = {"BTCUSDT", "ETHUSDT", "BADUSDT"}
+    index = {"BTCUSDT": {"lastPrice": "65000.5", "quoteVolume": "1e9"}, "BADUSDT": {"lastPrice": "n/a"}}
+    errors = []
+
+    assert check_binance_data("btc", pairs, index, errors) == {
+        "status_binance": "✅ Na Binance", "price_binance": 65000.5, "volume_binance": 1e9,
+    }
+    assert check_binance_data("XRP", pairs, index, errors)["status_binance"] == "❌ Não na Binance (USDT)"
+    assert check_binance_data("ETH", pairs, index, errors)["status_binance"] == "❌ ETH Não Listado (Ticker)"
+    assert check_binance_data("BTC", pairs, None, errors)["status_binance"] == "⚠️ Erro Conexão Binance"
+    assert check_binance_data("BTC", set(), index, errors)["status_binance"] == "⚠️ Binance Indisponível"
+    assert errors == []
+
+    bad = check_binance_data("BAD", pairs, index, errors)
+    assert bad["status_binance"] == "⚠️ Erro Dados Binance" and bad["price_binance"] is None
+    assert len(errors) == 1
@@ -0,0 +1,26 @@
+"""Tests for the Brave news cache."""
+from scanner import brave
+from scanner.brave import NewsCache
+
+
+def test_news_cache_expires_after_freshness_ttl(tmp_path, clock):
+    news_cache = NewsCache(str(tmp_path / "news.sqlite3"), max_entries=10)
+    news_cache.put("Bitcoin  Coin News", "pd", 3, {"news": []})
+    assert news_cache.get("bitcoin coin news", "pd", 3) == {"news": []}
+
+    clock.now += brave.NEWS_TTL_BY_FRESHNESS["pd"]
+    assert news_cache.get("bitcoin coin news", "pd", 3) is None
+
+
+def test_news_cache_evicts_least_recently_used(tmp_path, clock):
+    news_cache = NewsCache(str(tmp_path / "news.sqlite3"), max_entries=2)
+    for query in ("a", "b"):
+        news_cache.put(query, "pd", 3, {"query": query})
+        clock.now += 1
+    news_cache.get("a", "pd", 3) # "b" is now the least recently used
+    clock.now += 1
+    news_cache.put("c", "pd", 3, {"query": "c"})
+
+    assert news_cache.get("b", "pd", 3) is None
+    assert news_cache.get("a", "pd", 3) == {"query": "a"}
+    assert news_cache.get("c", "pd", 3) == {"query": "c"}
@@ -0,0 +1,101 @@
+"""Tests for the process-wide snapshot cache: single-flight fetches, stale fallback and backoff."""
+import threading
+import time
+
+from scanner import cache
+from scanner.cache import SnapshotCache
+from scanner.models import ScanError, ScanResult
+
+
+def failed_scan():
+    return ScanResult(None, (ScanError("coingecko", "error", "down"),))
+
+
+def test_concurrent_misses_share_one_fetch():
+    snapshot_cache = SnapshotCache()
+    calls = []
+    snapshot = object()
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2) # Every other caller arrives while this fetch is in flight
+        return ScanResult(snapshot)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(snapshot_cache.get_or_fetch("k", fetch, ttl=60)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert [result.snapshot for result in results] == [snapshot] * 8
+
+
+def test_last_good_snapshot_survives_failed_fetch(clock):
+    snapshot_cache = SnapshotCache()
+    snapshot = object()
+    snapshot_cache.get_or_fetch("k", lambda: ScanResult(snapshot), ttl=60)
+    clock.now += 61
+
+    result = snapshot_cache.get_or_fetch("k", failed_scan, ttl=60)
+
+    assert not result.ok
+    assert snapshot_cache.peek("k") is snapshot
+    assert snapshot_cache.last_failure("k") == result.errors
+
+
+def test_revalidate_backs_off_after_failure(clock):
+    snapshot_cache = SnapshotCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return failed_scan()
+
+    snapshot_cache.revalidate("k", fetch, ttl=60).result(timeout=5)
+    backed_off = snapshot_cache.revalidate("k", fetch, ttl=60).result(timeout=5)
+    assert len(calls) == 1
+    assert backed_off.errors == failed_scan().errors
+
+    clock.now += cache.FAILURE_BACKOFF_SECONDS
+    snapshot_cache.revalidate("k", fetch, ttl=60).result(timeout=5)
+    assert len(calls) == 2
+
+
+def rejected_key_scan():
+    return ScanResult(None, (ScanError("coingecko", "error", "API Key inválida", 401),))
+
+
+def test_rejected_key_is_not_shared_or_backed_off(clock):
+    snapshot_cache = SnapshotCache()
+    snapshot = object()
+    assert not snapshot_cache.revalidate("k", rejected_key_scan, ttl=60).result(timeout=5).ok
+    assert snapshot_cache.last_failure("k") == ()
+
+    result = snapshot_cache.revalidate("k", lambda: ScanResult(snapshot), ttl=60).result(timeout=5)
+    assert result.snapshot is snapshot
+
+
+def test_follower_retries_after_leader_key_is_rejected():
+    snapshot_cache = SnapshotCache()
+    snapshot = object()
+    leader_started = threading.Event()
+
+    def bad_key_fetch():
+        leader_started.set()
+        time.sleep(0.2)
+        return rejected_key_scan()
+
+    leader = threading.Thread(target=lambda: snapshot_cache.get_or_fetch("k", bad_key_fetch, ttl=60))
+    leader.start()
+    leader_started.wait(timeout=5)
+    revalidated = snapshot_cache.revalidate("k", lambda: ScanResult(snapshot), ttl=60)
+    followed = snapshot_cache.get_or_fetch("k", lambda: ScanResult(snapshot), ttl=60)
+    leader.join()
+
+    assert followed.snapshot is snapshot
+    assert revalidated.result(timeout=5).snapshot is snapshot
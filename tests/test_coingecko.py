@@ -0,0 +1,169 @@
+"""Tests for CoinGecko pagination, the market frame and the gainer rankings built from it."""
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from scanner import coingecko
+from scanner.coingecko import change_column, get_market_frame, rank_all_windows, rank_window
+
+
+def market(changes):
+    """Market frame with one row per coin and the given {window: [change per coin]}, NaN elsewhere."""
+    size = len(next(iter(changes.values())))
+    frame = pd.DataFrame({
+        "id": [f"coin{i}" for i in range(size)],
+        "name": [f"Coin {i}" for i in range(size)],
+        "symbol": [f"C{i}" for i in range(size)],
+        "current_price": 1.0,
+        "total_volume": 1e9,
+    })
+    return frame.assign(**{change_column(window): values for window, values in changes.items()})
+
+
+def test_combined_ranking_compares_windows_of_different_sizes(monkeypatch):
+    monkeypatch.setattr(coingecko, "RANKING_WINDOWS", ("24h", "7d", "1h-binance"))
+    binance = [np.nan] * 100
+    binance[0], binance[1], binance[2], binance[9] = 4.0, 3.0, 2.0, 1.0 # Only 4 coins have a Binance pair
+    frame = market({
+        "24h": list(range(100, 0, -1)), # coin i is (i + 1)th of 100
+        "7d": list(range(100, 0, -1)),
+        "1h-binance": binance,
+    })
+    ranked = rank_all_windows(frame, top_n=10)["id"].tolist()
+
+    # coin9 is 10th in both CoinGecko windows but last of the 4 Binance coins; coin8 is 9th and unlisted.
+    # Raw positions (10, 10, 4) would put coin9 ahead of coin8 (9, 9); relative ones (10%, 10%, 100%) do not.
+    assert "coin8" in ranked
+    assert "coin9" not in ranked
+    assert ranked[0] == "coin3" # First unlisted coin: 4% in both windows
+
+
+def test_combined_ranking_skips_missing_windows_and_requires_coverage(monkeypatch):
+    monkeypatch.setattr(coingecko, "RANKING_WINDOWS", ("24h", "7d", "14d", "1h-binance"))
+    nan = np.nan
+    frame = market({
+        "24h": [10.0, 5.0, 1.0, nan],
+        "7d": [10.0, 5.0, 1.0, nan],
+        "14d": [10.0, 5.0, 1.0, nan],
+        "1h-binance": [nan, nan, nan, 99.0],
+    })
+    ranked = rank_all_windows(frame, top_n=10)
+
+    assert ranked["id"].tolist() == ["coin0", "coin1", "coin2"] # coin3 has data in 1 of 4 windows
+    assert ranked["top_windows"].tolist() == [3, 3, 3]
+
+
+def coin(coin_id, volume=5e6, change=1.0):
+    """A /coins/markets row, decoded the way fetch_coingecko_page decodes it."""
+    return coingecko.coin_record({
+        "id": coin_id, "name": coin_id.title(), "symbol": coin_id[:3], "current_price": 1.0, "total_volume": volume,
+        **{change_column(window): change for window in coingecko.PRICE_CHANGE_WINDOWS},
+    })
+
+
+def http_error(status_code):
+    return requests.exceptions.HTTPError(response=SimpleNamespace(status_code=status_code))
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    """Serves {page number: rows or exception} instead of calling CoinGecko; records the pages requested."""
+    responses, requested = {}, []
+
+    def fetch(page_num, headers):
+        requested.append(page_num)
+        response = responses.get(page_num, [])
+        return (None, response) if isinstance(response, Exception) else (response, None)
+
+    monkeypatch.setattr(coingecko, "fetch_coingecko_page", fetch)
+    return responses, requested
+
+
+def test_market_frame_merges_every_requested_page(pages):
+    responses, requested = pages
+    responses.update({1: [coin("aaa"), coin("bbb")], 2: [coin("ccc")], 3: [coin("bbb", change=9.0)]})
+    errors = []
+    frame = get_market_frame("key", 3, errors)
+
+    assert sorted(requested) == [1, 2, 3]
+    assert errors == []
+    assert sorted(frame["id"]) == ["aaa", "bbb", "ccc"]
+    assert frame.set_index("id").loc["bbb", change_column("24h")] == 9.0 # Last page's copy of a duplicate wins
+
+
+def test_market_frame_keeps_partial_data_after_a_rate_limited_page(pages):
+    responses, _ = pages
+    responses.update({1: [coin("aaa")], 2: http_error(429), 3: [coin("ccc")]})
+    errors = []
+    frame = get_market_frame("key", 3, errors)
+
+    assert sorted(frame["id"]) == ["aaa", "ccc"]
+    assert [(error.status_code, "página 2" in error.message) for error in errors] == [(429, True)]
+
+
+def test_market_frame_stops_on_a_rejected_key(pages):
+    responses, _ = pages
+    responses.update({1: [coin("aaa")], 2: http_error(401)})
+    errors = []
+
+    assert get_market_frame("bad-key", 3, errors) is None
+    assert [(error.level, error.status_code) for error in errors] == [("error", 401)]
+
+
+def test_market_frame_reports_connection_errors_and_empty_results(pages):
+    responses, _ = pages
+    responses[1] = requests.exceptions.ConnectionError("refused")
+    errors = []
+    assert get_market_frame("key", 1, errors) is None
+    assert errors[0].source == "coingecko" and "conexão" in errors[0].message
+
+    errors = []
+    assert get_market_frame("", 1, errors) is None
+    assert errors[0].level == "warning"
+
+
+def test_market_frame_drops_low_volume_coins(pages):
+    responses, _ = pages
+    responses[1] = [coin("aaa"), coin("bbb", volume=10.0)]
+    errors = []
+    assert get_market_frame("key", 1, errors)["id"].tolist() == ["aaa"]
+
+
+def test_build_market_frame_types_and_filters_rows():
+    frame = coingecko.build_market_frame([
+        coin("aaa")._replace(current_price="1.5", total_volume="5000000"), # Numbers sent as strings
+        coin("bbb")._replace(name=None, symbol="bbb"),
+        coin("ccc", volume=None),
+        coin("ddd", change=None), # No change in any window
+        coin("aaa", change=7.0), # Later copy of aaa
+    ])
+
+    assert frame["id"].tolist() == ["bbb", "aaa"]
+    assert frame["current_price"].dtype == "float64"
+    assert frame.set_index("id").loc["aaa", change_column("24h")] == 7.0
+    assert frame.set_index("id").loc["bbb", "name"] == "N/A"
+    assert frame.set_index("id").loc["bbb", "symbol"] == "BBB"
+
+
+def test_rank_window_keeps_the_best_rows_with_a_value():
+    frame = market({"24h": [1.0, np.nan, 3.0, 2.0, -5.0]})
+    assert rank_window(frame, "24h", top_n=3)["id"].tolist() == ["coin2", "coin3", "coin0"]
+    assert len(rank_window(frame, "24h", top_n=10)) == 4 # coin1 has no 24h change
+
+
+def test_coin_record_keeps_only_the_fields_the_scanner_reads():
+    page = json.dumps([
+        {"id": "aaa", "symbol": "aaa", "name": "Aaa", "current_price": 2.5, "market_cap": 1e9,
+         "roi": {"times": 1.2, "currency": "usd"}, change_column("24h"): 4.0},
+    ])
+    coins = json.loads(page, object_hook=coingecko.coin_record)
+
+    assert coins == [coingecko.CoinRecord(
+        id="aaa", name="Aaa", symbol="aaa", current_price=2.5, total_volume=None,
+        **{change_column(window): 4.0 if window == "24h" else None for window in coingecko.PRICE_CHANGE_WINDOWS},
+    )]
+    assert coingecko.coin_record({"times": 1.2}) == {"times": 1.2} # Nested objects pass through
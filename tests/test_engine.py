@@ -0,0 +1,84 @@
+"""Tests for the engine's window tables and snapshot persistence."""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from scanner import cache, engine
+from scanner.coingecko import change_column
+from scanner.config import RANKING_WINDOWS
+from scanner.engine import build_binance_df, gain_column, multi_window_df, window_gainers_df
+from scanner.models import MarketSnapshot
+
+
+def snapshot(market_df, listed=()):
+    """A MarketSnapshot of `market_df` where the `listed` symbols were checked on Binance."""
+    binance_df = build_binance_df([
+        {"Símbolo": symbol, "Status Binance": "✅ Listada", "Preço Binance (USD)": 1.0, "Volume Binance (24h)": 2.0}
+        for symbol in listed
+    ])
+    return MarketSnapshot(market_df, binance_df, engine._window_table(market_df, binance_df, "24h"), datetime(2026, 1, 1))
+
+
+def market(size, windows=("24h",)):
+    """Coins C0..C{size-1}, best first in `windows` and last first in the 1h one (no change elsewhere)."""
+    frame = pd.DataFrame({
+        "id": [f"coin{i}" for i in range(size)],
+        "name": [f"Coin {i}" for i in range(size)],
+        "symbol": [f"C{i}" for i in range(size)],
+        "current_price": 1.0,
+        "total_volume": 1e9,
+    })
+    changes = {change_column(window): np.nan for window in RANKING_WINDOWS}
+    changes.update({change_column(window): np.arange(size, 0, -1, dtype=float) for window in windows})
+    changes[change_column("1h")] = np.arange(size, dtype=float)
+    return frame.assign(**changes)
+
+
+def test_every_window_is_ranked_from_the_same_snapshot():
+    scan = snapshot(market(5), listed=["C0"])
+
+    day = window_gainers_df(scan, "24h", top_n=3)
+    hour = window_gainers_df(scan, "1h", top_n=3)
+    assert day["Símbolo"].tolist() == ["C0", "C1", "C2"]
+    assert hour["Símbolo"].tolist() == ["C4", "C3", "C2"]
+    assert hour[gain_column("1h")].tolist() == [4.0, 3.0, 2.0]
+    assert day["Status Binance"].tolist() == ["✅ Listada", "❌ Verif. Indisponível", "❌ Verif. Indisponível"]
+    assert window_gainers_df(scan, "7d", top_n=3).empty # No coin has a 7d change
+
+
+def test_multi_window_table_has_a_column_per_window():
+    table = multi_window_df(snapshot(market(5, windows=RANKING_WINDOWS[1:])), top_n=3)
+
+    assert table["Símbolo"].tolist() == ["C0", "C1", "C2"]
+    assert {gain_column(window) for window in RANKING_WINDOWS} <= set(table.columns)
+    assert "Posição média (%)" in table
+
+
+def test_saved_snapshot_is_restored_as_it_was(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "SNAPSHOT_DIR", str(tmp_path))
+    saved = snapshot(market(5), listed=["C0", "C3"])
+    engine.save_snapshot(saved, pages=2)
+    restored = engine.load_snapshot(2)
+
+    assert restored.restored and not saved.restored
+    assert restored.fetched_at_utc == saved.fetched_at_utc
+    pd.testing.assert_frame_equal(restored.market_df, saved.market_df)
+    pd.testing.assert_frame_equal(restored.binance_df, saved.binance_df)
+    pd.testing.assert_frame_equal(restored.coins_df, saved.coins_df)
+    assert engine.load_snapshot(3) is None # Nothing saved for this depth
+
+
+def test_snapshots_are_not_persisted_when_disabled(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "SNAPSHOT_DIR", "")
+    monkeypatch.chdir(tmp_path) # Catches a write to a relative path
+    engine.save_snapshot(snapshot(market(5)), pages=2)
+    assert engine.load_snapshot(2) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_rank_changes_against_the_previous_ranking():
+    previous = pd.DataFrame({"Símbolo": ["A", "B", "C", "D"]})
+    current = pd.DataFrame({"Símbolo": ["B", "A", "C", "E"]})
+    assert engine.rank_changes(current, previous) == ["▲ 1", "▼ 1", "=", "🆕"]
+    assert engine.rank_changes(current, previous.iloc[:0]) == ["🆕"] * 4
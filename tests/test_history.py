@@ -0,0 +1,48 @@
+"""Tests for the Parquet snapshot history."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pandas as pd
+
+from scanner.history import HistoryStore
+
+
+def history_snapshot(fetched_at, symbol="BTC"):
+    market_df = pd.DataFrame({"id": [symbol.lower()], "symbol": [symbol], "current_price": [1.0]})
+    return SimpleNamespace(market_df=market_df, fetched_at_utc=fetched_at)
+
+
+def test_history_retention_and_compaction(tmp_path):
+    store = HistoryStore(str(tmp_path), retention_days=3, flush_rows=1, flush_seconds=3600)
+    now = datetime.utcnow()
+    yesterday = (now - timedelta(days=1)).replace(hour=10, minute=0)
+    store.append(history_snapshot(now - timedelta(days=5)), pages=1)
+    store.append(history_snapshot(yesterday, "BTC"), pages=1)
+    store.append(history_snapshot(yesterday + timedelta(hours=1), "ETH"), pages=1)
+    store.append(history_snapshot(now), pages=1)
+
+    partitions = store.partitions()
+    assert sorted(partitions) == [yesterday.date(), now.date()] # The 5-day-old partition is past retention
+    assert [path.rsplit("/", 1)[-1] for path in store._files(partitions[yesterday.date()])] == [
+        "part-000000-compacted.parquet"
+    ]
+    assert len(store._files(partitions[now.date()])) == 1 # Today is never compacted
+
+    history = store.read(start=yesterday - timedelta(hours=1))
+    assert history["symbol"].tolist() == ["BTC", "ETH", "BTC"]
+    assert store.read(symbols=["eth"])["symbol"].tolist() == ["ETH"]
+
+
+def test_a_failed_write_does_not_fail_the_append(tmp_path, monkeypatch, capsys):
+    store = HistoryStore(str(tmp_path), flush_rows=1, flush_seconds=3600)
+
+    def broken_writer(*args, **kwargs):
+        raise ValueError("unsupported type") # What pyarrow raises for data it cannot convert
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", broken_writer)
+    store.append(history_snapshot(datetime.utcnow()), pages=1)
+
+    assert "History not written" in capsys.readouterr().err
+    monkeypatch.undo()
+    store.append(history_snapshot(datetime.utcnow()), pages=1) # Later appends still work
+    assert len(store.read()) == 1
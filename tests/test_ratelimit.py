@@ -0,0 +1,51 @@
+"""Tests for the per-upstream adaptive rate limiters."""
+from types import SimpleNamespace
+
+import pytest
+
+from scanner.ratelimit import AdaptiveRateLimiter, KeyedRateLimiters, per_minute_limiter
+
+
+def test_token_bucket_spaces_requests(clock):
+    limiter = AdaptiveRateLimiter("test", rate=2, burst=1)
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == pytest.approx(0.5)
+    assert limiter.acquire() == pytest.approx(0.5)
+
+
+def test_per_minute_budget_holds_in_any_60s_window(clock):
+    limiter = per_minute_limiter("coingecko", calls_per_minute=30, burst=8)
+    starts = []
+    for _ in range(120):
+        limiter.acquire() # The fake clock's sleep advances time by the wait
+        starts.append(clock.now)
+    most_in_a_minute = max(sum(start <= later < start + 60 - 1e-6 for later in starts) for start in starts)
+    assert most_in_a_minute <= 30
+
+
+def test_keyed_limiters_scope_rates_to_their_key(clock):
+    limiters = KeyedRateLimiters("brave")
+    own_key = limiters.get("own-key", rate=10)
+    shared_key = limiters.get("env-key", rate=1)
+    assert own_key is not shared_key
+    assert limiters.get("own-key", rate=10) is own_key
+    assert shared_key.max_rate == 1
+
+    assert [own_key.acquire() for _ in range(2)] == [0, pytest.approx(0.1)]
+    assert [shared_key.acquire() for _ in range(2)] == [0, pytest.approx(1)]
+
+
+def test_binance_weight_waits_for_next_minute(clock):
+    clock.now = 1_000_000.0 # 40s into an epoch minute
+    limiter = AdaptiveRateLimiter("binance", weight_limit=100)
+    assert limiter.acquire(weight=50) == 0
+    assert limiter.acquire(weight=50) == pytest.approx(20) # 100 > 90% of the budget: waits for the next minute
+    assert limiter.used_weight == 50
+
+
+def test_429_blocks_for_retry_after_and_slows_down(clock):
+    limiter = AdaptiveRateLimiter("test", rate=10, burst=10)
+    response = SimpleNamespace(status_code=429, headers={"Retry-After": "3"})
+    assert limiter.observe(response) == 3
+    assert limiter.rate == 5
+    assert limiter.acquire() == pytest.approx(3)
@@ -0,0 +1,44 @@
+"""Tests for recording upstream responses as fixtures and replaying them offline."""
+import pytest
+import requests
+
+from scanner.mocks import MockUpstreamServer
+from scanner.recording import ReplayAdapter, install_recorder, load_fixtures
+
+
+@pytest.fixture
+def fixtures_dir(tmp_path):
+    """Fixtures recorded from the mock upstreams (one CoinGecko page, one Binance error) and the page's coin ids."""
+    with MockUpstreamServer(coins=20) as server:
+        session = requests.Session()
+        install_recorder(session, tmp_path)
+        page = session.get(f"{server.url}/api/v3/coins/markets", params={"page": 1, "per_page": 5},
+                    headers={"x-cg-demo-api-key": "secret"})
+        session.get(f"{server.url}/api/v3/ticker/24hr", params={"symbol": "NOPEUSDT"})
+    return tmp_path, [coin["id"] for coin in page.json()]
+
+
+def replay_session(directory):
+    session = requests.Session()
+    session.mount("http://", ReplayAdapter(load_fixtures(directory)))
+    return session
+
+
+def test_replay_serves_recorded_responses_regardless_of_host_and_parameter_order(fixtures_dir):
+    fixtures_dir, recorded_ids = fixtures_dir
+    session = replay_session(fixtures_dir)
+    response = session.get("http://replay.invalid/api/v3/coins/markets?per_page=5&page=1")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/json"
+    assert len(recorded_ids) == 5
+    assert [coin["id"] for coin in response.json()] == recorded_ids
+    assert "secret" not in "".join(path.read_text() for path in fixtures_dir.iterdir()) # Auth headers are never saved
+
+
+def test_replay_keeps_error_statuses_and_fails_unknown_requests(fixtures_dir):
+    session = replay_session(fixtures_dir[0])
+    assert session.get("http://replay.invalid/api/v3/ticker/24hr?symbol=NOPEUSDT").status_code == 400
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get("http://replay.invalid/api/v3/coins/markets?page=2&per_page=5")
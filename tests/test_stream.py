@@ -0,0 +1,87 @@
+"""Tests for the live ticker table and the Binance stream consumer, against the mock WebSocket server."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from scanner.config import UPSTREAMS
+from scanner.stream import BinanceTickerStream, LiveTickerTable
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def mini_ticker(symbol, price, event_ms):
+    return {"e": "24hrMiniTicker", "E": event_ms, "s": symbol, "c": str(price), "q": "100.0"}
+
+
+def test_live_table_keeps_the_newest_event_per_symbol():
+    table = LiveTickerTable()
+    table.update("BTCUSDT", 100.0, 5.0, event_ms=2000)
+    table.update("BTCUSDT", 90.0, 4.0, event_ms=1000) # Arrives late
+    table.update("ETHUSDT", 10.0, 1.0, event_ms=1500)
+
+    assert len(table) == 2
+    assert table.get("BTCUSDT") == {"symbol": "BTCUSDT", "lastPrice": 100.0, "quoteVolume": 5.0}
+    assert table.get("SOLUSDT", "missing") == "missing"
+
+
+def test_a_jump_in_event_time_marks_a_gap():
+    stream = BinanceTickerStream("ws://unused", gap_seconds=5)
+    stream._needs_resync = False
+    stream._apply([mini_ticker("BTCUSDT", 1, 10_000), mini_ticker("ETHUSDT", 1, 14_000)])
+    assert (stream.gaps, stream._needs_resync) == (0, False)
+
+    stream._apply([mini_ticker("BTCUSDT", 2, 20_000)]) # 6 s after the last event
+    assert (stream.gaps, stream._needs_resync) == (1, True)
+    assert stream.table.get("BTCUSDT")["lastPrice"] == 2.0
+
+
+@pytest.fixture
+def mock_stream(monkeypatch):
+    """The mock Binance stream (pausing 1 s every 10 messages) and its REST resync endpoint; yields the WebSocket URL."""
+    websockets = pytest.importorskip("websockets")
+    from scanner.mocks.binance_ws import MarketState, serve_rest, stream_handler
+
+    state = MarketState(20)
+    rest = serve_rest(state, 0)
+    monkeypatch.setitem(UPSTREAMS["binance"], "base_url", f"http://127.0.0.1:{rest.server_address[1]}")
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    handler = stream_handler(state, interval=0.05, gap_every=10, gap_seconds=1.0)
+
+    async def serve():
+        return await websockets.serve(handler, "127.0.0.1", 0)
+
+    async def close():
+        server.close()
+        await server.wait_closed()
+
+    server = asyncio.run_coroutine_threadsafe(serve(), loop).result()
+    yield f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}/ws/!miniTicker@arr"
+    asyncio.run_coroutine_threadsafe(close(), loop).result(timeout=10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    rest.shutdown()
+
+
+def test_stream_resyncs_and_recovers_from_a_silent_connection(mock_stream):
+    stream = BinanceTickerStream(mock_stream, gap_seconds=0.5).start()
+    try:
+        assert wait_for(stream.is_fresh) # Connected and synchronised from REST
+        assert len(stream.table) == 20
+        assert stream.table.get("BTCUSDT")["lastPrice"] > 0
+
+        assert wait_for(lambda: stream.gaps >= 1) # The server went quiet for longer than gap_seconds
+        assert wait_for(lambda: stream.reconnects >= 1 and stream.is_fresh())
+    finally:
+        stream.stop()